@@ -1,11 +1,13 @@
 import pandas as pd
 import numpy as np
 
+from src.data_cleaning.schema import ESQUEMAS_CRUDOS
+
 def analyze_data():
     print("Loading data...")
     try:
-        df_trans = pd.read_csv('transacciones_logistica_v2.csv')
-        df_inv = pd.read_csv('inventario_central_v2.csv')
+        df_trans = pd.read_csv('transacciones_logistica_v2.csv', dtype=ESQUEMAS_CRUDOS['transacciones'])
+        df_inv = pd.read_csv('inventario_central_v2.csv', dtype=ESQUEMAS_CRUDOS['inventario'])
     except Exception as e:
         print(f"Error loading data: {e}")
         return
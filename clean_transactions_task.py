@@ -1,11 +1,15 @@
 import pandas as pd
 import numpy as np
 
+from src.data_cleaning.imputacion import imputar_mediana_por_grupo
+from src.data_cleaning.indices import construir_indice_claves, pertenece
+from src.data_cleaning.schema import ESQUEMAS_CRUDOS, ESQUEMAS_LIMPIOS, aplicar_esquema
+
 def clean_transactions():
     print("Cargando datos...")
     # Cargar datos
-    df_trans = pd.read_csv('transacciones_logistica_v2.csv')
-    df_inv = pd.read_csv('inventario_central_v2.csv')
+    df_trans = pd.read_csv('transacciones_logistica_v2.csv', dtype=ESQUEMAS_CRUDOS['transacciones'])
+    df_inv = pd.read_csv('inventario_central_v2.csv', dtype=ESQUEMAS_CRUDOS['inventario'])
     
     print(f"Transacciones originales: {len(df_trans)} registros")
     
@@ -13,12 +17,11 @@ def clean_transactions():
     # 1. INTEGRIDAD REFERENCIAL (SKUs Huérfanos)
     # =========================================================================
     print("\n--- 1. Analizando Integridad Referencial ---")
-    skus_inv = set(df_inv['SKU_ID'].unique())
-    skus_trans = set(df_trans['SKU_ID'].unique())
-    skus_huerfanos = skus_trans - skus_inv
+    indice_inventario = construir_indice_claves(df_inv['SKU_ID'])
     
     # Marcar huérfanos con flag
-    df_trans['Sin_Catalogo'] = df_trans['SKU_ID'].isin(skus_huerfanos)
+    df_trans['Sin_Catalogo'] = ~pertenece(indice_inventario, df_trans['SKU_ID'])
+    skus_huerfanos = df_trans.loc[df_trans['Sin_Catalogo'], 'SKU_ID'].unique()
     num_huerfanos = df_trans['Sin_Catalogo'].sum()
     
     # Calcular impacto económico
@@ -58,20 +61,12 @@ def clean_transactions():
     print(f"Registros con Tiempo_Entrega_Real >= 999: {num_outliers}")
     
     if num_outliers > 0:
-        # Calcular mediana por ciudad (excluyendo los outliers para el cálculo)
-        data_valida = df_trans[~outliers_mask]
-        mediana_global = data_valida['Tiempo_Entrega_Real'].median()
-        
-        # Imputar
-        # Para simplificar en este script demostrativo, usamos mapeo directo si existe ciudad, sino global
-        medianas_ciudad = data_valida.groupby('Ciudad_Destino')['Tiempo_Entrega_Real'].median()
-        
-        def imputar_tiempo(row):
-            if row['Tiempo_Entrega_Real'] >= 999:
-                return medianas_ciudad.get(row['Ciudad_Destino'], mediana_global)
-            return row['Tiempo_Entrega_Real']
-            
-        df_trans['Tiempo_Entrega_Real_Imputado'] = df_trans.apply(imputar_tiempo, axis=1)
+        # Imputar con la mediana por ciudad (excluyendo los outliers para el cálculo)
+        df_trans['Tiempo_Entrega_Real_Imputado'], detalle = imputar_mediana_por_grupo(
+            df_trans, 'Tiempo_Entrega_Real', 'Ciudad_Destino', centinela=999
+        )
+        for ciudad, info in detalle['medianas_por_grupo'].items():
+            print(f"   - {ciudad}: {info['cantidad']} registros -> {info['mediana']} días")
         
         # Verificación
         print(f"ACCIÓN: Se imputaron los {num_outliers} valores usando la mediana por ciudad de destino.")
@@ -85,6 +80,7 @@ def clean_transactions():
     # =========================================================================
     # GUARDAR RESULTADO
     # =========================================================================
+    df_trans = aplicar_esquema(df_trans, ESQUEMAS_LIMPIOS['transacciones'])
     output_file = 'transacciones_logistica_limpio.csv'
     df_trans.to_csv(output_file, index=False)
     print(f"\nArchivo limpio guardado como: {output_file}")
@@ -10,11 +10,11 @@ import warnings
 warnings.filterwarnings('ignore')
 
 # Importar módulos propios
-from src.data_cleaning import cargar_datos
-from src.analytics import ejecutar_limpieza_completa, validar_integridad
-from src.visualizations import generar_dashboard_estrategico
+from src.analytics import obtener_pipeline, estadisticas_cache_pipeline, validar_integridad_cacheada, reporte_memoria, indice_filtros, vista_filtrada
+from src.visualizations import generar_dashboard_estrategico, figura_cacheada, figura_histograma, estadisticas_cache_figuras
 from src.ai import generar_analisis_ia
-from src.ui import mostrar_tab_auditoria
+from src.ui import mostrar_tab_auditoria, pestanas_perezosas, expander_perezoso, seccion_abierta, mostrar_filtros_globales, mostrar_explorador
+from src.ui import ETIQUETAS_FORMATO, boton_descarga_dataframe, boton_descarga_paquete
 
 # =============================================================================
 # CONFIGURACIÓN DE PÁGINA STREAMLIT
@@ -26,32 +26,45 @@ st.set_page_config(
     initial_sidebar_state="expanded"
 )
 
+# =============================================================================
+# VISTA FILTRADA (OPERACIONES, CLIENTE E IA)
+# =============================================================================
+
+def obtener_vista(resultados, filtro):
+    """Vista filtrada de los resultados con el aviso del filtro activo (sin filtro: tablas completas)."""
+    vista = vista_filtrada(resultados, filtro)
+    if vista['filtro']:
+        st.info(
+            f"🎛️ Filtro activo: {len(vista['analitica']['tabla_hechos']):,} de "
+            f"{len(resultados['analitica']['tabla_hechos']):,} registros de la tabla de hechos."
+        )
+        if len(vista['analitica']['tabla_hechos']) == 0:
+            st.warning("⚠️ Ningún registro cumple los filtros seleccionados.")
+            st.stop()
+    return vista
+
+
 # =============================================================================
 # APLICACIÓN PRINCIPAL
 # =============================================================================
 
 def main():
     # =========================================================================
-    # CARGAR DATOS ORIGINALES
+    # CARGAR DATOS Y EJECUTAR LIMPIEZA (CACHEADO POR HUELLA DE LOS ARCHIVOS)
     # =========================================================================
+    # Copy-on-write: la limpieza no modifica los originales, no se necesitan copias.
+    # La caché del pipeline comparte el resultado entre reruns y sesiones sin
+    # deserializar copias; solo se recalcula si cambia el contenido de los CSV.
     try:
-        df_inventario_original, df_transacciones_original, df_feedback_original = cargar_datos()
+        pipeline = obtener_pipeline()
     except Exception as e:
         st.error(f"Error al cargar los datos: {e}")
         st.stop()
     
-    # =========================================================================
-    # EJECUTAR LIMPIEZA (CACHEADO)
-    # =========================================================================
-    @st.cache_data
-    def ejecutar_pipeline_limpieza():
-        return ejecutar_limpieza_completa(
-            df_inventario_original.copy(),
-            df_transacciones_original.copy(),
-            df_feedback_original.copy()
-        )
-    
-    resultados = ejecutar_pipeline_limpieza()
+    df_inventario_original = pipeline['originales']['inventario']
+    df_transacciones_original = pipeline['originales']['transacciones']
+    df_feedback_original = pipeline['originales']['feedback']
+    resultados = pipeline['resultados']
     
     # =========================================================================
     # SIDEBAR NAVIGATION
@@ -73,6 +86,11 @@ def main():
             key="nav_radio"
         )
         
+        st.markdown("---")
+        
+        # Filtros globales (índices precalculados sobre la tabla de hechos)
+        filtro = mostrar_filtros_globales(indice_filtros(resultados))
+        
         st.markdown("---")
         st.markdown("### 📊 Health Score Global")
         
@@ -80,6 +98,19 @@ def main():
         health_promedio = sum(resultados['health_despues'].values()) / len(resultados['health_despues'])
         st.metric("Calidad de Datos", f"{health_promedio:.1f}/100")
         
+        estadisticas_cache = estadisticas_cache_pipeline()
+        st.caption(
+            f"🗄️ Caché pipeline: {estadisticas_cache['hits']} hits · "
+            f"{estadisticas_cache['misses']} misses ({estadisticas_cache['hits_disco']} desde disco) · "
+            f"{estadisticas_cache['mb']} MB"
+        )
+        estadisticas_figuras = estadisticas_cache_figuras()
+        st.caption(
+            f"🖼️ Caché figuras: {estadisticas_figuras['hits']} hits · "
+            f"{estadisticas_figuras['misses']} misses · {estadisticas_figuras['figuras']} figuras · "
+            f"{estadisticas_figuras['mb']} MB"
+        )
+        
         st.markdown("---")
         st.caption("✨ **Módulos Activos:**")
         st.caption("✅ Limpieza de Datos")
@@ -94,185 +125,282 @@ def main():
     # =========================================================================
     # CONTENIDO PRINCIPAL POR PÁGINA
     # =========================================================================
-    
     if pagina == "🔍 Auditoría":
         # Tab de Auditoría con sub-tabs
-        tab_aud1, tab_aud2, tab_aud3, tab_aud4 = st.tabs([
+        tab_aud1, tab_aud2, tab_aud3, tab_aud4 = pestanas_perezosas([
             "📊 Health Score",
             "✅ Validaciones",
             "📋 Datos Limpios",
             "📈 Resumen"
-        ])
+        ], key="tabs_auditoria")
         
         with tab_aud1:
-            mostrar_tab_auditoria(resultados)
+            if seccion_abierta(tab_aud1):
+                mostrar_tab_auditoria(resultados)
         
         with tab_aud2:
-            st.subheader("✅ Validaciones de Integridad")
-            df_validaciones = validar_integridad(
-                resultados['dataframes']['transacciones'],
-                resultados['dataframes']['inventario'],
-                df_transacciones_original
-            )
-            st.dataframe(df_validaciones, use_container_width=True)
+            if seccion_abierta(tab_aud2):
+                st.subheader("✅ Validaciones de Integridad")
+                df_validaciones = validar_integridad_cacheada(resultados, df_transacciones_original)
+                st.dataframe(df_validaciones, use_container_width=True)
             
-            passed = df_validaciones['estado'].str.contains('PASS|DOCUMENTADO').sum()
-            total = len(df_validaciones)
-            if passed == total:
-                st.success(f"🎉 Todas las validaciones pasaron ({passed}/{total})")
-            else:
-                st.warning(f"⚠️ {passed}/{total} validaciones pasaron.")
+                passed = df_validaciones['estado'].str.contains('PASS|DOCUMENTADO').sum()
+                total = len(df_validaciones)
+                if passed == total:
+                    st.success(f"🎉 Todas las validaciones pasaron ({passed}/{total})")
+                else:
+                    st.warning(f"⚠️ {passed}/{total} validaciones pasaron.")
         
         with tab_aud3:
-            st.subheader("📋 Vista Previa de Datos Limpios")
-            dataset_seleccionado = st.selectbox(
-                "Seleccionar dataset:",
-                ['inventario', 'transacciones', 'feedback'],
-                key="dataset_selector_aud"
-            )
-            df_mostrar = resultados['dataframes'][dataset_seleccionado]
+            if seccion_abierta(tab_aud3):
+                st.subheader("📋 Vista Previa de Datos Limpios")
+                dataset_seleccionado = st.selectbox(
+                    "Seleccionar dataset:",
+                    ['inventario', 'transacciones', 'feedback'],
+                    key="dataset_selector_aud"
+                )
+                df_mostrar = resultados['dataframes'][dataset_seleccionado]
             
-            col1, col2, col3 = st.columns(3)
-            with col1:
-                st.metric("Registros", f"{len(df_mostrar):,}")
-            with col2:
-                st.metric("Columnas", len(df_mostrar.columns))
-            with col3:
-                st.metric("Health Score", f"{resultados['health_despues'][dataset_seleccionado]:.1f}")
+                col1, col2, col3 = st.columns(3)
+                with col1:
+                    st.metric("Registros", f"{len(df_mostrar):,}")
+                with col2:
+                    st.metric("Columnas", len(df_mostrar.columns))
+                with col3:
+                    st.metric("Health Score", f"{resultados['health_despues'][dataset_seleccionado]:.1f}")
             
-            st.dataframe(df_mostrar.head(100), use_container_width=True)
-            st.download_button(
-                label=f"📥 Descargar {dataset_seleccionado}_limpio.csv",
-                data=df_mostrar.to_csv(index=False).encode('utf-8'),
-                file_name=f'{dataset_seleccionado}_limpio.csv',
-                mime='text/csv',
-                key="download_clean_aud"
-            )
+                # Explorador paginado: orden, filtros y búsqueda en el servidor, solo se envía la página visible
+                mostrar_explorador(
+                    df_mostrar,
+                    huella=f"{resultados['huella']}:{dataset_seleccionado}",
+                    clave=f"explorador_{dataset_seleccionado}"
+                )
+            
+                expander_memoria = expander_perezoso("💾 Memoria retenida por dataset", key="expander_memoria")
+                with expander_memoria:
+                    if seccion_abierta(expander_memoria):
+                        st.dataframe(
+                            reporte_memoria(
+                                {
+                                    'inventario': df_inventario_original,
+                                    'transacciones': df_transacciones_original,
+                                    'feedback': df_feedback_original
+                                },
+                                resultados['dataframes']
+                            ),
+                            use_container_width=True
+                        )
+                        st.caption("Las columnas que la limpieza no modificó comparten memoria con los datos originales (copy-on-write).")
+            
+                if 'tiempos_etapas' in resultados:
+                    expander_tiempos = expander_perezoso("⏱️ Tiempo por etapa del pipeline", key="expander_tiempos")
+                    with expander_tiempos:
+                        if seccion_abierta(expander_tiempos):
+                            df_tiempos = pd.DataFrame(
+                                sorted(resultados['tiempos_etapas'].items(), key=lambda item: -item[1]),
+                                columns=['Etapa', 'Segundos']
+                            )
+                            st.dataframe(df_tiempos.round(3), use_container_width=True, hide_index=True)
+                            st.caption("Las etapas independientes se ejecutan en paralelo; solo la limpieza de transacciones espera al inventario limpio.")
+
+                # Descargas diferidas: el archivo se genera al hacer clic y se guarda por huella
+                col_formato, col_descarga, col_paquete = st.columns([1, 2, 2])
+                with col_formato:
+                    formato = st.selectbox(
+                        "Formato",
+                        list(ETIQUETAS_FORMATO),
+                        format_func=ETIQUETAS_FORMATO.get,
+                        key="formato_descarga_aud"
+                    )
+                with col_descarga:
+                    boton_descarga_dataframe(
+                        f"📥 Descargar {dataset_seleccionado}_limpio ({ETIQUETAS_FORMATO[formato]})",
+                        df_mostrar,
+                        huella=f"{resultados['huella']}:{dataset_seleccionado}",
+                        nombre_base=f'{dataset_seleccionado}_limpio',
+                        key="download_clean_aud",
+                        formato=formato
+                    )
+                with col_paquete:
+                    boton_descarga_paquete(resultados, key="download_paquete_aud")
         
         with tab_aud4:
-            from src.analytics import generar_reporte_limpieza
+            if seccion_abierta(tab_aud4):
+                from src.analytics import generar_reporte_limpieza
             
-            st.subheader("📈 Resumen de Decisiones")
-            df_reporte = generar_reporte_limpieza(resultados)
-            st.dataframe(df_reporte, use_container_width=True)
+                st.subheader("📈 Resumen de Decisiones")
+                df_reporte = generar_reporte_limpieza(resultados)
+                st.dataframe(df_reporte, use_container_width=True)
             
-            with st.expander("Ver Decisiones Clave"):
-                st.markdown("""
-                **1. Stock Negativo:** Cambio de signo (error de digitación).
-                **2. SKUs Huérfanos:** Conservados con flag `Sin_Catalogo`.
-                **3. Tiempos 999 días:** Imputados con mediana por ciudad.
-                **4. Costos Atípicos:** Marcados para revisión manual.
-                **5. Edades Imposibles:** Imputadas con mediana.
-                """)
+                with st.expander("Ver Decisiones Clave"):
+                    st.markdown("""
+                    **1. Stock Negativo:** Cambio de signo (error de digitación).
+                    **2. SKUs Huérfanos:** Conservados con flag `Sin_Catalogo`.
+                    **3. Tiempos 999 días:** Imputados con mediana por ciudad.
+                    **4. Costos Atípicos:** Marcados para revisión manual.
+                    **5. Edades Imposibles:** Imputadas con mediana.
+                    """)
     
     elif pagina == "🚚 Operaciones":
         st.header("🚚 Dashboard de Operaciones Logísticas")
+        vista = obtener_vista(resultados, filtro)
         
-        # Sub-tabs dentro de Operaciones
-        tab_op1, tab_op2, tab_op3 = st.tabs([
+        # Sub-tabs dentro de Operaciones: una sección del dashboard estratégico por pestaña
+        # (solo se ejecuta la pestaña abierta)
+        tab_op1, tab_op2, tab_op3, tab_op4, tab_op5 = pestanas_perezosas([
             "💸 Rentabilidad",
             "🚛 Logística",
-            "👻 Venta Invisible"
-        ])
+            "👻 Venta Invisible",
+            "❤️ Fidelidad",
+            "⚠️ Riesgo Operativo"
+        ], key="tabs_operaciones")
         
-        with tab_op1:
-            # Dashboard estratégico
+        def dashboard(seccion):
             generar_dashboard_estrategico(
-                resultados['dataframes']['transacciones'],
-                resultados['dataframes']['inventario'],
-                resultados['dataframes']['feedback']
+                vista['dataframes']['transacciones'],
+                vista['dataframes']['inventario'],
+                vista['dataframes']['feedback'],
+                df_full=vista['analitica']['tabla_hechos'],
+                cubo=vista['analitica']['cubo'],
+                skus_por_categoria=vista['analitica']['skus_por_categoria'],
+                huella=vista['huella'],
+                secciones=[seccion]
             )
+        
+        with tab_op1:
+            if seccion_abierta(tab_op1):
+                dashboard('fuga_capital')
+        
+        with tab_op2:
+            if seccion_abierta(tab_op2):
+                dashboard('crisis_logistica')
+                st.markdown("---")
+                st.subheader("🚛 Distribución de Tiempos de Entrega")
+
+                fig_entrega = figura_cacheada(vista['huella'], {'grafico': 'tiempo_entrega'}, lambda: figura_histograma(
+                    vista['analitica']['histogramas'],
+                    'Tiempo_Entrega_Real',
+                    titulo='Distribución de Tiempo de Entrega Real',
+                    color='#EF553B',
+                    etiqueta='Tiempo de Entrega (Días)'
+                ))
+                st.plotly_chart(fig_entrega, use_container_width=True)
+        
+        with tab_op3:
+            if seccion_abierta(tab_op3):
+                dashboard('venta_invisible')
+        
+        with tab_op4:
+            if seccion_abierta(tab_op4):
+                dashboard('fidelidad')
+        
+        with tab_op5:
+            if seccion_abierta(tab_op5):
+                dashboard('riesgo_operativo')
     
     elif pagina == "👥 Cliente":
         st.header("👥 Análisis de Experiencia del Cliente")
+        vista = obtener_vista(resultados, filtro)
         
-        df_feedback = resultados['dataframes']['feedback']
-        df_trans = resultados['dataframes']['transacciones']
+        df_feedback = vista['dataframes']['feedback']
+        df_trans = vista['dataframes']['transacciones']
+        histogramas = vista['analitica']['histogramas']
         
         # Sub-tabs dentro de Cliente
-        tab_cli1, tab_cli2, tab_cli3 = st.tabs([
+        tab_cli1, tab_cli2, tab_cli3 = pestanas_perezosas([
             "⭐ Ratings",
             "📊 NPS",
             "🎫 Tickets Soporte"
-        ])
+        ], key="tabs_cliente")
         
         with tab_cli1:
-            st.subheader("⭐ Análisis de Ratings")
+            if seccion_abierta(tab_cli1):
+                st.subheader("⭐ Análisis de Ratings")
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Rating Producto (Promedio)", f"{df_feedback['Rating_Producto'].mean():.2f} / 5")
-            with col2:
-                st.metric("Rating Logística (Promedio)", f"{df_feedback['Rating_Logistica'].mean():.2f} / 5")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Rating Producto (Promedio)", f"{df_feedback['Rating_Producto'].mean():.2f} / 5")
+                with col2:
+                    st.metric("Rating Logística (Promedio)", f"{df_feedback['Rating_Logistica'].mean():.2f} / 5")
             
-            # Distribución de ratings
-            fig_rating = px.histogram(
-                df_feedback,
-                x='Rating_Producto',
-                nbins=5,
-                title='Distribución de Rating de Producto',
-                color_discrete_sequence=['#636EFA']
-            )
-            st.plotly_chart(fig_rating, use_container_width=True)
+                # Distribución de ratings y edades (conteos precalculados por el pipeline)
+                col3, col4 = st.columns(2)
+                with col3:
+                    fig_rating = figura_cacheada(vista['huella'], {'grafico': 'rating_producto'}, lambda: figura_histograma(
+                        histogramas,
+                        'Rating_Producto',
+                        titulo='Distribución de Rating de Producto',
+                        color='#636EFA'
+                    ))
+                    st.plotly_chart(fig_rating, use_container_width=True)
+                with col4:
+                    fig_edad = figura_cacheada(vista['huella'], {'grafico': 'edad_cliente'}, lambda: figura_histograma(
+                        histogramas,
+                        'Edad_Cliente',
+                        titulo='Distribución de Edad de Clientes',
+                        color='#AB63FA'
+                    ))
+                    st.plotly_chart(fig_edad, use_container_width=True)
         
         with tab_cli2:
-            st.subheader("📊 Net Promoter Score (NPS)")
+            if seccion_abierta(tab_cli2):
+                st.subheader("📊 Net Promoter Score (NPS)")
             
-            nps_promedio = df_feedback['Satisfaccion_NPS'].mean()
+                nps_promedio = df_feedback['Satisfaccion_NPS'].mean()
             
-            # Clasificar NPS
-            df_feedback['NPS_Categoria'] = pd.cut(
-                df_feedback['Satisfaccion_NPS'],
-                bins=[-101, -50, 0, 50, 101],
-                labels=['Detractores', 'Pasivos Negativos', 'Pasivos Positivos', 'Promotores']
-            )
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("NPS Promedio", f"{nps_promedio:.1f}")
+                with col2:
+                    promotores_pct = (df_feedback['Satisfaccion_NPS'] > 50).mean() * 100
+                    st.metric("% Promotores (NPS > 50)", f"{promotores_pct:.1f}%")
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("NPS Promedio", f"{nps_promedio:.1f}")
-            with col2:
-                promotores_pct = (df_feedback['Satisfaccion_NPS'] > 50).mean() * 100
-                st.metric("% Promotores (NPS > 50)", f"{promotores_pct:.1f}%")
-            
-            fig_nps = px.histogram(
-                df_feedback,
-                x='Satisfaccion_NPS',
-                nbins=20,
-                title='Distribución de NPS',
-                color_discrete_sequence=['#00CC96']
-            )
-            fig_nps.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="Neutral")
-            st.plotly_chart(fig_nps, use_container_width=True)
+                def construir_nps():
+                    fig_nps = figura_histograma(
+                        histogramas,
+                        'Satisfaccion_NPS',
+                        titulo='Distribución de NPS',
+                        color='#00CC96'
+                    )
+                    fig_nps.add_vline(x=0, line_dash="dash", line_color="red", annotation_text="Neutral")
+                    return fig_nps
+
+                fig_nps = figura_cacheada(vista['huella'], {'grafico': 'nps'}, construir_nps)
+                st.plotly_chart(fig_nps, use_container_width=True)
         
         with tab_cli3:
-            st.subheader("🎫 Tickets de Soporte")
+            if seccion_abierta(tab_cli3):
+                st.subheader("🎫 Tickets de Soporte")
             
-            # Tasa de tickets
-            tasa_tickets = df_feedback['Ticket_Soporte_Abierto'].mean() * 100
+                # Tasa de tickets
+                tasa_tickets = df_feedback['Ticket_Soporte_Abierto'].mean() * 100
             
-            col1, col2 = st.columns(2)
-            with col1:
-                st.metric("Tasa de Tickets Abiertos", f"{tasa_tickets:.1f}%")
-            with col2:
-                total_tickets = df_feedback['Ticket_Soporte_Abierto'].sum()
-                st.metric("Total Tickets Abiertos", f"{total_tickets:,}")
+                col1, col2 = st.columns(2)
+                with col1:
+                    st.metric("Tasa de Tickets Abiertos", f"{tasa_tickets:.1f}%")
+                with col2:
+                    total_tickets = df_feedback['Ticket_Soporte_Abierto'].sum()
+                    st.metric("Total Tickets Abiertos", f"{total_tickets:,}")
             
-            # Tickets por recomendación
-            tickets_recomendacion = df_feedback.groupby('Recomienda_Marca')['Ticket_Soporte_Abierto'].mean().reset_index()
-            tickets_recomendacion['Tasa_Tickets'] = tickets_recomendacion['Ticket_Soporte_Abierto'] * 100
+                # Tickets por recomendación (la agregación se hace solo al construir la figura)
+                def construir_tickets():
+                    tickets_recomendacion = df_feedback.groupby('Recomienda_Marca', observed=True)['Ticket_Soporte_Abierto'].mean().reset_index()
+                    tickets_recomendacion['Tasa_Tickets'] = tickets_recomendacion['Ticket_Soporte_Abierto'] * 100
+                    return px.bar(
+                        tickets_recomendacion,
+                        x='Recomienda_Marca',
+                        y='Tasa_Tickets',
+                        title='Tasa de Tickets según Recomendación de Marca',
+                        color='Tasa_Tickets',
+                        color_continuous_scale='RdYlGn_r'
+                    )
             
-            fig_tickets = px.bar(
-                tickets_recomendacion,
-                x='Recomienda_Marca',
-                y='Tasa_Tickets',
-                title='Tasa de Tickets según Recomendación de Marca',
-                color='Tasa_Tickets',
-                color_continuous_scale='RdYlGn_r'
-            )
-            st.plotly_chart(fig_tickets, use_container_width=True)
+                fig_tickets = figura_cacheada(vista['huella'], {'grafico': 'tickets_recomendacion'}, construir_tickets)
+                st.plotly_chart(fig_tickets, use_container_width=True)
     
     elif pagina == "🤖 Insights IA":
         st.header("🤖 Insights Generados por IA (Llama-3.3)")
+        vista = obtener_vista(resultados, filtro)
         st.markdown("---")
         
         st.markdown("""
@@ -313,7 +441,7 @@ def main():
                 format_func=lambda x: x.capitalize(),
                 key="ia_dataset_selector"
             )
-            df_ia = resultados['dataframes'][dataset_ia]
+            df_ia = vista['dataframes'][dataset_ia]
             
         with col_sel2:
             st.info(f"Analizando **{len(df_ia):,}** registros de {dataset_ia.capitalize()}.")
@@ -5,3 +5,8 @@ Módulo principal de inicialización del paquete.
 
 __version__ = "1.0.0"
 __author__ = "Pedro Saldarriaga"
+
+# El pipeline asume semántica copy-on-write (los DataFrames limpios comparten
+# los buffers de las columnas no modificadas con los originales, sin copias
+# defensivas). Es el comportamiento por defecto desde pandas 3.0, la versión
+# mínima en requirements.txt; el paquete no cambia opciones globales de pandas.
@@ -3,14 +3,62 @@ Módulo de Análisis y Métricas
 Contiene funciones para cálculo de métricas de calidad y validaciones.
 """
 
-from .metrics import calcular_health_score, calcular_metricas_calidad, detectar_outliers_score
-from .validation import validar_integridad, ejecutar_limpieza_completa, generar_reporte_limpieza
+from .metrics import calcular_health_score, calcular_metricas_calidad, detectar_outliers_score, perfilar_dataset, perfilar_dataset_aproximado
+from .hechos import construir_tabla_hechos
+from .cubo import construir_cubo, agregar_cubo, distintos_por_dimension
+from .histogramas import calcular_histograma, calcular_histogramas
+from .explorador import consultar_pagina, permutacion_orden, mascara_filtros
+from .exportacion import exportar_dataframe, exportar_paquete, huella_reportes, limpiar_cache_exportaciones, FORMATOS_EXPORTACION
+from .filtros import construir_indice_filtros, indice_filtros, normalizar_filtro, filas_filtradas, vista_filtrada
+from .memoria import reporte_memoria, bytes_unicos
+from .resumenes import resumir_dataset, combinar_resumenes, actualizar_resumen, perfil_desde_resumen
+from .planificador import ejecutar_dag
+from .almacen import guardar_resultados, cargar_resultados, version_codigo
+from .cache_pipeline import obtener_pipeline, estadisticas_cache_pipeline, limpiar_cache_pipeline
+from .validation import validar_integridad, validar_integridad_cacheada, ejecutar_limpieza_completa, generar_reporte_limpieza, generar_justificaciones, incorporar_perfiles_exactos
 
 __all__ = [
     'calcular_health_score',
     'calcular_metricas_calidad',
     'detectar_outliers_score',
+    'perfilar_dataset',
+    'perfilar_dataset_aproximado',
+    'resumir_dataset',
+    'combinar_resumenes',
+    'actualizar_resumen',
+    'perfil_desde_resumen',
     'validar_integridad',
+    'validar_integridad_cacheada',
     'ejecutar_limpieza_completa',
-    'generar_reporte_limpieza'
+    'generar_reporte_limpieza',
+    'generar_justificaciones',
+    'incorporar_perfiles_exactos',
+    'reporte_memoria',
+    'bytes_unicos',
+    'construir_tabla_hechos',
+    'construir_cubo',
+    'agregar_cubo',
+    'distintos_por_dimension',
+    'calcular_histograma',
+    'calcular_histogramas',
+    'construir_indice_filtros',
+    'indice_filtros',
+    'normalizar_filtro',
+    'filas_filtradas',
+    'vista_filtrada',
+    'consultar_pagina',
+    'permutacion_orden',
+    'mascara_filtros',
+    'exportar_dataframe',
+    'exportar_paquete',
+    'huella_reportes',
+    'limpiar_cache_exportaciones',
+    'FORMATOS_EXPORTACION',
+    'ejecutar_dag',
+    'obtener_pipeline',
+    'estadisticas_cache_pipeline',
+    'limpiar_cache_pipeline',
+    'guardar_resultados',
+    'cargar_resultados',
+    'version_codigo'
 ]
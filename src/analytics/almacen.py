@@ -0,0 +1,171 @@
+"""
+Almacén persistente de resultados del pipeline
+Guarda en disco los DataFrames limpios y las tablas analíticas (Parquet) y
+los registros/métricas (JSON) para que un proceso recién iniciado sirva el
+primer request sin volver a limpiar. Cada versión se identifica por la huella de los archivos
+fuente más la versión del código de limpieza.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+from collections.abc import Mapping
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from ..data_cleaning.cache import DIRECTORIO_CACHE
+
+
+DIRECTORIO_RESULTADOS = DIRECTORIO_CACHE / 'resultados'
+
+# Versiones (datos + código) que se conservan en disco
+MAX_VERSIONES_DISCO = 3
+
+# Claves de resultados que se persisten como JSON
+CLAVES_JSON = [
+    'registros', 'health_antes', 'health_despues', 'mejora',
+    'metricas_antes', 'metricas_despues', 'tiempos_etapas', 'huella'
+]
+
+# Tablas derivadas (resultados['analitica']) se guardan con este prefijo
+PREFIJO_ANALITICA = 'analitica-'
+
+_RAIZ_SRC = Path(__file__).resolve().parent.parent
+
+
+def version_codigo():
+    """
+    Huella del código que produce los resultados (limpieza y métricas).
+    Cualquier cambio en esos módulos invalida las versiones guardadas.
+    """
+    sha = hashlib.sha256()
+    for paquete in ['data_cleaning', 'analytics']:
+        for ruta in sorted((_RAIZ_SRC / paquete).glob('*.py')):
+            sha.update(ruta.name.encode('utf-8'))
+            sha.update(ruta.read_bytes())
+    return sha.hexdigest()[:16]
+
+
+def _a_json(valor):
+    if isinstance(valor, np.generic):
+        return valor.item()
+    if isinstance(valor, (pd.Timestamp, np.datetime64)):
+        return str(valor)
+    raise TypeError(f"No serializable: {type(valor).__name__}")
+
+
+class DataFramesPerezosos(Mapping):
+    """
+    Diccionario {dataset: DataFrame} que lee cada Parquet la primera vez que
+    se accede a él; los siguientes accesos retornan el mismo objeto.
+    """
+
+    def __init__(self, rutas):
+        self._rutas = dict(rutas)
+        self._cargados = {}
+        self._candado = threading.Lock()
+
+    def __getitem__(self, nombre):
+        if nombre not in self._cargados:
+            with self._candado:
+                if nombre not in self._cargados:
+                    self._cargados[nombre] = pd.read_parquet(self._rutas[nombre])
+        return self._cargados[nombre]
+
+    def __iter__(self):
+        return iter(self._rutas)
+
+    def __len__(self):
+        return len(self._rutas)
+
+    def cargados(self):
+        """DataFrames ya leídos (sin forzar la carga del resto)."""
+        return dict(self._cargados)
+
+
+def _directorio_version(clave):
+    return DIRECTORIO_RESULTADOS / clave
+
+
+def guardar_resultados(clave, resultados, directorio=None):
+    """
+    Persiste los resultados bajo la clave (escritura atómica por directorio).
+    Si los perfiles exactos siguen pendientes no se guarda nada.
+
+    Returns:
+        bool: True si la versión quedó en disco
+    """
+    if resultados.get('perfiles_pendientes'):
+        return False
+
+    directorio = Path(directorio) if directorio else _directorio_version(clave)
+    if directorio.exists():
+        return True
+
+    temporal = directorio.with_name(f'{directorio.name}.tmp-{os.getpid()}-{threading.get_ident()}')
+    try:
+        temporal.mkdir(parents=True, exist_ok=True)
+        for nombre, df in resultados['dataframes'].items():
+            df.to_parquet(temporal / f'{nombre}.parquet')
+        for nombre, df in resultados.get('analitica', {}).items():
+            df.to_parquet(temporal / f'{PREFIJO_ANALITICA}{nombre}.parquet')
+        contenido = {clave_json: resultados[clave_json] for clave_json in CLAVES_JSON if clave_json in resultados}
+        (temporal / 'resultados.json').write_text(
+            json.dumps(contenido, default=_a_json, ensure_ascii=False),
+            encoding='utf-8'
+        )
+        os.replace(temporal, directorio)
+    except (OSError, ImportError, ValueError, TypeError):
+        shutil.rmtree(temporal, ignore_errors=True)
+        return directorio.exists()
+
+    desalojar_versiones(directorio.parent)
+    return True
+
+
+def cargar_resultados(clave, directorio=None):
+    """
+    Carga una versión guardada. Los DataFrames se leen de forma perezosa
+    (DataFramesPerezosos). Actualiza la fecha de uso para el desalojo LRU.
+
+    Returns:
+        dict | None: resultados, o None si la versión no existe o está dañada
+    """
+    directorio = Path(directorio) if directorio else _directorio_version(clave)
+    ruta_json = directorio / 'resultados.json'
+    try:
+        contenido = json.loads(ruta_json.read_text(encoding='utf-8'))
+        os.utime(ruta_json)
+    except (OSError, ValueError):
+        return None
+
+    rutas = {}
+    rutas_analitica = {}
+    for ruta in directorio.glob('*.parquet'):
+        if ruta.stem.startswith(PREFIJO_ANALITICA):
+            rutas_analitica[ruta.stem[len(PREFIJO_ANALITICA):]] = ruta
+        else:
+            rutas[ruta.stem] = ruta
+    if set(rutas) != set(contenido.get('registros', {})):
+        return None
+
+    resultados = dict(contenido)
+    resultados['dataframes'] = DataFramesPerezosos(rutas)
+    resultados['analitica'] = DataFramesPerezosos(rutas_analitica)
+    resultados.update(intervalos_antes={}, intervalos_despues={}, perfiles_pendientes={})
+    return resultados
+
+
+def desalojar_versiones(directorio=DIRECTORIO_RESULTADOS, max_versiones=MAX_VERSIONES_DISCO):
+    """Elimina las versiones menos usadas recientemente por encima del máximo."""
+    versiones = [
+        ruta for ruta in Path(directorio).glob('*')
+        if ruta.is_dir() and (ruta / 'resultados.json').exists()
+    ]
+    versiones.sort(key=lambda ruta: (ruta / 'resultados.json').stat().st_mtime_ns, reverse=True)
+    for ruta in versiones[max_versiones:]:
+        shutil.rmtree(ruta, ignore_errors=True)
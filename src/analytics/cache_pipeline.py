@@ -0,0 +1,164 @@
+"""
+Caché en memoria de resultados del pipeline por huella de los archivos fuente
+Los resultados se comparten entre sesiones y reruns como objetos de solo
+lectura: un hit no copia ni deserializa los DataFrames.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+from ..data_cleaning.cache import huella_archivo
+from ..data_cleaning.utils import RUTAS_DATOS, leer_datasets
+from .almacen import DataFramesPerezosos, cargar_resultados, guardar_resultados, version_codigo
+from .memoria import bytes_unicos
+from .validation import ejecutar_limpieza_completa, incorporar_perfiles_exactos, instantanea_resultados
+
+
+# Versiones de datos distintas que se mantienen en memoria
+MAX_ENTRADAS = 2
+
+_ENTRADAS = OrderedDict()
+_HUELLAS_ARCHIVOS = {}
+_ESTADISTICAS = {'hits': 0, 'misses': 0, 'hits_disco': 0}
+
+# _CANDADO protege solo los diccionarios; cada clave en construcción tiene su
+# propio candado, así un miss no bloquea a las sesiones que piden otra clave
+_CANDADO = threading.Lock()
+_CANDADOS_CLAVE = {}
+
+
+def huella_entradas(rutas=None):
+    """
+    Clave de contenido de los archivos fuente.
+    Solo hace stat() de cada archivo; el hash se recalcula únicamente si
+    cambió el tamaño o el mtime (ver huella_archivo).
+    """
+    rutas = rutas or RUTAS_DATOS
+    huellas = {}
+    for nombre, ruta in sorted(rutas.items()):
+        with _CANDADO:
+            previa = _HUELLAS_ARCHIVOS.get(ruta)
+        huella = huella_archivo(ruta, previa)
+        with _CANDADO:
+            _HUELLAS_ARCHIVOS[ruta] = huella
+        huellas[nombre] = huella['sha256']
+    return hashlib.sha256(json.dumps(huellas, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def _bytes_entrada(entrada):
+    """
+    Memoria de la entrada contando una vez los buffers compartidos (copy-on-write).
+    Los DataFrames aún no leídos del almacén en disco no cuentan.
+    """
+    tablas = list(entrada['originales'].values())
+    for grupo in [entrada['resultados']['dataframes'], entrada['resultados'].get('analitica', {})]:
+        if isinstance(grupo, DataFramesPerezosos):
+            grupo = grupo.cargados()
+        tablas.extend(grupo.values())
+    return bytes_unicos(tablas)
+
+
+def _persistir_al_terminar(clave_disco, resultados):
+    """
+    Guarda en disco cuando ya no quedan perfiles exactos pendientes. Se
+    persiste una instantánea: las sesiones pueden seguir usando resultados.
+    """
+    def al_terminar(_futuro):
+        if incorporar_perfiles_exactos(resultados) == 0:
+            guardar_resultados(clave_disco, instantanea_resultados(resultados))
+
+    pendientes = list(resultados.get('perfiles_pendientes', {}).values())
+    if not pendientes:
+        guardar_resultados(clave_disco, instantanea_resultados(resultados))
+    for futuro in pendientes:
+        futuro.add_done_callback(al_terminar)
+
+
+def obtener_pipeline(rutas=None, max_entradas=MAX_ENTRADAS, persistir=True):
+    """
+    Retorna los datasets originales y los resultados de la limpieza para el
+    contenido actual de los archivos fuente.
+
+    En un hit retorna los mismos objetos ya calculados (no modificarlos).
+    En un miss lee los datasets y busca los resultados en el almacén en disco
+    (persistir=True); si no están, ejecuta ejecutar_limpieza_completa y los
+    guarda. La entrada en memoria descarta la menos usada si hay más de
+    max_entradas.
+
+    Returns:
+        dict: {'huella', 'originales': {nombre: df}, 'resultados': dict}
+    """
+    clave = huella_entradas(rutas)
+
+    with _CANDADO:
+        if clave in _ENTRADAS:
+            _ESTADISTICAS['hits'] += 1
+            _ENTRADAS.move_to_end(clave)
+            return _ENTRADAS[clave]
+        candado_clave = _CANDADOS_CLAVE.setdefault(clave, threading.Lock())
+
+    try:
+        with candado_clave:
+            # Otra sesión pudo construir la misma clave mientras se esperaba
+            with _CANDADO:
+                if clave in _ENTRADAS:
+                    _ESTADISTICAS['hits'] += 1
+                    _ENTRADAS.move_to_end(clave)
+                    return _ENTRADAS[clave]
+                _ESTADISTICAS['misses'] += 1
+
+            originales = leer_datasets(rutas)
+
+            # Almacén en disco (sobrevive reinicios): misma huella y mismo código
+            clave_disco = f'{clave[:24]}-{version_codigo()}'
+            resultados = cargar_resultados(clave_disco) if persistir else None
+            if resultados is not None:
+                with _CANDADO:
+                    _ESTADISTICAS['hits_disco'] += 1
+            else:
+                resultados = ejecutar_limpieza_completa(
+                    originales['inventario'],
+                    originales['transacciones'],
+                    originales['feedback']
+                )
+                if persistir:
+                    _persistir_al_terminar(clave_disco, resultados)
+
+            entrada = {'huella': clave, 'originales': originales, 'resultados': resultados}
+            # Memoria medida una vez al insertar (estadisticas_cache_pipeline solo suma)
+            entrada['bytes'] = _bytes_entrada(entrada)
+
+            with _CANDADO:
+                _ENTRADAS[clave] = entrada
+                while len(_ENTRADAS) > max_entradas:
+                    _ENTRADAS.popitem(last=False)
+            return entrada
+    finally:
+        # También si la lectura o la limpieza fallan: no quedan candados huérfanos
+        with _CANDADO:
+            if _CANDADOS_CLAVE.get(clave) is candado_clave:
+                del _CANDADOS_CLAVE[clave]
+
+
+def estadisticas_cache_pipeline():
+    """
+    Hits, misses (y cuántos se sirvieron desde disco), entradas y memoria (MB)
+    de la caché del pipeline. La memoria de cada entrada se mide al insertarla.
+    """
+    with _CANDADO:
+        return {
+            'hits': _ESTADISTICAS['hits'],
+            'misses': _ESTADISTICAS['misses'],
+            'hits_disco': _ESTADISTICAS['hits_disco'],
+            'entradas': len(_ENTRADAS),
+            'mb': round(sum(entrada['bytes'] for entrada in _ENTRADAS.values()) / 1e6, 2)
+        }
+
+
+def limpiar_cache_pipeline():
+    """Vacía la caché y reinicia las estadísticas."""
+    with _CANDADO:
+        _ENTRADAS.clear()
+        _ESTADISTICAS.update(hits=0, misses=0, hits_disco=0)
@@ -0,0 +1,105 @@
+"""
+Cubo OLAP de agregados aditivos sobre la tabla de hechos
+Cada celda guarda suma, conteo y suma de cuadrados por medida, así cualquier
+agrupación por un subconjunto de dimensiones (media, total, conteo,
+desviación) se obtiene sumando celdas, sin recorrer las transacciones.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+DIMENSIONES_CUBO = [
+    'Ciudad_Destino', 'Bodega_Origen', 'Categoria', 'Canal_Venta', 'Mes_Venta', 'Sin_Catalogo'
+]
+
+MEDIDAS_CUBO = [
+    'Precio_Venta_Final', 'Cantidad_Vendida', 'Margen_Total', 'Tiempo_Entrega_Real',
+    'Satisfaccion_NPS', 'Stock_Actual', 'Rating_Producto', 'Dias_Sin_Revisar', 'Ticket_Numerico'
+]
+
+# Columnas no numéricas de las que solo se guarda el conteo de no nulos
+CONTEOS_CUBO = ['Transaccion_ID']
+
+
+def construir_cubo(df_hechos, dimensiones=None, medidas=None, conteos=None):
+    """
+    Precalcula los agregados aditivos por combinación de dimensiones.
+
+    Las celdas conservan los valores nulos de las dimensiones (dropna=False)
+    para que los roll-ups por otras dimensiones no pierdan filas.
+
+    Returns:
+        pd.DataFrame: una fila por celda con las dimensiones, 'filas' y
+        '<medida>__suma', '<medida>__conteo', '<medida>__suma_cuadrados'
+        ('<columna>__conteo' para las columnas de conteos)
+    """
+    dimensiones = [d for d in (dimensiones or DIMENSIONES_CUBO) if d in df_hechos.columns]
+    medidas = [m for m in (medidas or MEDIDAS_CUBO) if m in df_hechos.columns]
+    conteos = [c for c in (conteos or CONTEOS_CUBO) if c in df_hechos.columns]
+
+    columnas = {dimension: df_hechos[dimension] for dimension in dimensiones}
+    columnas['filas'] = np.ones(len(df_hechos), dtype='int64')
+    for medida in medidas:
+        valores = df_hechos[medida].astype('float64')
+        columnas[f'{medida}__suma'] = valores
+        columnas[f'{medida}__conteo'] = valores.notna().astype('int64')
+        columnas[f'{medida}__suma_cuadrados'] = valores * valores
+    for columna in conteos:
+        columnas[f'{columna}__conteo'] = df_hechos[columna].notna().astype('int64')
+
+    return (
+        pd.DataFrame(columnas, index=df_hechos.index)
+        .groupby(dimensiones, observed=True, dropna=False, sort=False)
+        .sum(min_count=0)
+        .reset_index()
+    )
+
+
+def agregar_cubo(cubo, dimensiones, agregaciones):
+    """
+    Roll-up del cubo a las dimensiones pedidas, equivalente a
+    df_hechos.groupby(dimensiones, observed=True).agg(agregaciones).reset_index().
+
+    Args:
+        cubo (pd.DataFrame): Resultado de construir_cubo
+        dimensiones (list): Subconjunto de las dimensiones del cubo
+        agregaciones (dict): {columna: 'mean' | 'sum' | 'count' | 'std'};
+            la columna especial 'filas' da el número de filas
+
+    Returns:
+        pd.DataFrame
+    """
+    dimensiones = list(dimensiones)
+    sumas = cubo.drop(columns=[c for c in DIMENSIONES_CUBO if c in cubo.columns and c not in dimensiones])
+    sumas = sumas.groupby(dimensiones, observed=True).sum()
+
+    resultado = pd.DataFrame(index=sumas.index)
+    for columna, funcion in agregaciones.items():
+        if columna == 'filas':
+            resultado[columna] = sumas['filas']
+            continue
+        conteo = sumas[f'{columna}__conteo']
+        if funcion == 'count':
+            resultado[columna] = conteo
+        elif funcion == 'sum':
+            resultado[columna] = sumas[f'{columna}__suma']
+        elif funcion == 'mean':
+            resultado[columna] = sumas[f'{columna}__suma'] / conteo.where(conteo > 0)
+        elif funcion == 'std':
+            media = sumas[f'{columna}__suma'] / conteo.where(conteo > 0)
+            varianza = (sumas[f'{columna}__suma_cuadrados'] - conteo * media ** 2) / (conteo - 1).where(conteo > 1)
+            resultado[columna] = np.sqrt(varianza.clip(lower=0))
+        else:
+            raise ValueError(f"Agregación no soportada en el cubo: {funcion}")
+
+    return resultado.reset_index()
+
+
+def distintos_por_dimension(df_hechos, dimension, columna):
+    """
+    Conteo de valores distintos de 'columna' por 'dimension'.
+    nunique no es aditivo (no se puede sumar entre celdas), por eso se
+    precalcula aparte para las dimensiones que lo necesitan.
+    """
+    return df_hechos.groupby(dimension, observed=True)[columna].nunique().reset_index()
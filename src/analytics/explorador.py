@@ -0,0 +1,143 @@
+"""
+Consultas paginadas sobre los datasets limpios (explorador de datos)
+Ordenar, filtrar y buscar se resuelve en el servidor con posiciones: las
+permutaciones de orden y las máscaras de filtro se guardan por huella del
+dataset y solo se materializan las filas de la página visible.
+"""
+
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+
+TAMANO_PAGINA = 50
+
+# Permutaciones de orden / máscaras de filtro que se mantienen en memoria
+MAX_ORDENES = 16
+MAX_MASCARAS = 32
+
+_ORDENES = OrderedDict()
+_MASCARAS = OrderedDict()
+_CANDADO = threading.Lock()
+
+
+def _memorizar(cache, clave, maximo, calcular):
+    with _CANDADO:
+        if clave in cache:
+            cache.move_to_end(clave)
+            return cache[clave]
+    valor = calcular()
+    with _CANDADO:
+        cache[clave] = valor
+        while len(cache) > maximo:
+            cache.popitem(last=False)
+    return valor
+
+
+def permutacion_orden(df, huella, columna, ascendente=True):
+    """
+    Posiciones de las filas ordenadas por la columna (orden estable, nulos al
+    final). Se calcula una vez por (huella, columna, sentido).
+    """
+    def calcular():
+        serie = df[columna].reset_index(drop=True)
+        return serie.sort_values(ascending=ascendente, kind='stable', na_position='last').index.to_numpy()
+
+    return _memorizar(_ORDENES, (huella, columna, ascendente), MAX_ORDENES, calcular)
+
+
+def _contiene(serie, texto):
+    """Máscara de 'contiene texto' (sin distinguir mayúsculas). En categóricas se evalúa por categoría."""
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        categorias = serie.cat.categories.astype(str)
+        coincide = np.append(categorias.str.contains(texto, case=False, regex=False), False)
+        return coincide[serie.cat.codes.to_numpy()]
+    return serie.astype('string').str.contains(texto, case=False, regex=False).fillna(False).to_numpy(dtype=bool)
+
+
+def _mascara_condicion(serie, condicion):
+    if 'valores' in condicion:
+        return serie.isin(condicion['valores']).to_numpy(dtype=bool)
+    if 'rango' in condicion:
+        minimo, maximo = condicion['rango']
+        mascara = serie.notna()
+        if minimo is not None:
+            mascara = mascara & (serie >= minimo).fillna(False)
+        if maximo is not None:
+            mascara = mascara & (serie <= maximo).fillna(False)
+        return mascara.to_numpy(dtype=bool)
+    if 'contiene' in condicion:
+        return _contiene(serie, condicion['contiene'])
+    raise ValueError(f"Condición de filtro no soportada: {sorted(condicion)}")
+
+
+def mascara_filtros(df, huella, filtros=None, busqueda=None):
+    """
+    Máscara booleana (por posición) de las filas que cumplen todos los filtros
+    de columna y contienen el texto de búsqueda en alguna columna de texto.
+
+    Args:
+        filtros (dict): {columna: {'valores': [...]} | {'rango': (min, max)} |
+            {'contiene': texto}}
+        busqueda (str): Texto a buscar en columnas de texto y categóricas
+
+    Returns:
+        np.ndarray | None: None si no hay filtros
+    """
+    filtros = {columna: condicion for columna, condicion in (filtros or {}).items() if condicion}
+    busqueda = (busqueda or '').strip()
+    if not filtros and not busqueda:
+        return None
+
+    def calcular():
+        mascara = np.ones(len(df), dtype=bool)
+        for columna, condicion in filtros.items():
+            mascara &= _mascara_condicion(df[columna], condicion)
+        if busqueda:
+            coincide = np.zeros(len(df), dtype=bool)
+            for columna in df.columns:
+                serie = df[columna]
+                if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_string_dtype(serie.dtype):
+                    coincide |= _contiene(serie, busqueda)
+            mascara &= coincide
+        return mascara
+
+    clave = (huella, json.dumps(filtros, sort_keys=True, default=str), busqueda.lower())
+    return _memorizar(_MASCARAS, clave, MAX_MASCARAS, calcular)
+
+
+def consultar_pagina(df, huella, pagina=0, tamano=TAMANO_PAGINA, orden=None, ascendente=True,
+                     filtros=None, busqueda=None):
+    """
+    Página de un dataset ordenado y filtrado en el servidor.
+
+    Args:
+        df (pd.DataFrame): Dataset completo (no se copia)
+        huella (str): Huella del dataset (clave de las permutaciones y máscaras)
+        pagina (int): Página (desde 0); se ajusta al rango válido
+        tamano (int): Filas por página
+        orden (str): Columna de orden (None: orden original)
+        ascendente (bool): Sentido del orden
+        filtros, busqueda: ver mascara_filtros
+
+    Returns:
+        dict: 'filas' (DataFrame de la página), 'total' (filas que cumplen
+        los filtros), 'paginas', 'pagina' y 'desde' (posición de la primera fila)
+    """
+    posiciones = permutacion_orden(df, huella, orden, ascendente) if orden else None
+    mascara = mascara_filtros(df, huella, filtros, busqueda)
+
+    if mascara is not None:
+        posiciones = np.flatnonzero(mascara) if posiciones is None else posiciones[mascara[posiciones]]
+    total = len(df) if posiciones is None else len(posiciones)
+
+    paginas = max(1, -(-total // tamano))
+    pagina = min(max(int(pagina), 0), paginas - 1)
+    desde = pagina * tamano
+    hasta = min(desde + tamano, total)
+
+    filas = df.iloc[desde:hasta] if posiciones is None else df.iloc[posiciones[desde:hasta]]
+    return {'filas': filas, 'total': total, 'paginas': paginas, 'pagina': pagina, 'desde': desde}
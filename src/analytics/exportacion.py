@@ -0,0 +1,117 @@
+"""
+Exportación de datasets y reportes para descarga
+Los archivos se generan solo cuando se piden y los bytes se guardan por
+huella de los datos. El CSV se escribe por bloques de filas directamente al
+buffer (o al gzip / zip) para no armar el texto completo en memoria.
+"""
+
+import gzip
+import io
+import threading
+import zipfile
+from collections import OrderedDict
+
+from .validation import generar_justificaciones, generar_reporte_limpieza
+
+
+FORMATOS_EXPORTACION = {
+    'csv': {'extension': 'csv', 'mime': 'text/csv'},
+    'csv.gz': {'extension': 'csv.gz', 'mime': 'application/gzip'},
+    'parquet': {'extension': 'parquet', 'mime': 'application/vnd.apache.parquet'}
+}
+
+# Filas por bloque al escribir CSV
+FILAS_POR_BLOQUE = 50_000
+
+# Tamaño máximo (MB) de los archivos guardados en la caché
+MAX_MB_EXPORTACIONES = 256
+
+_ARCHIVOS = OrderedDict()
+_CANDADO = threading.Lock()
+
+
+def escribir_csv(df, destino):
+    """Escribe df como CSV UTF-8 (sin índice) en un archivo binario, por bloques de filas."""
+    texto = io.TextIOWrapper(destino, encoding='utf-8', newline='')
+    for inicio in range(0, max(len(df), 1), FILAS_POR_BLOQUE):
+        df.iloc[inicio:inicio + FILAS_POR_BLOQUE].to_csv(texto, index=False, header=inicio == 0)
+    texto.flush()
+    texto.detach()
+
+
+def escribir_dataframe(df, destino, formato):
+    """Escribe df en el formato pedido ('csv', 'csv.gz' o 'parquet') en un archivo binario."""
+    if formato == 'csv':
+        escribir_csv(df, destino)
+    elif formato == 'csv.gz':
+        with gzip.GzipFile(fileobj=destino, mode='wb', mtime=0) as comprimido:
+            escribir_csv(df, comprimido)
+    elif formato == 'parquet':
+        df.to_parquet(destino, index=False)
+    else:
+        raise ValueError(f"Formato de exportación no soportado: {formato}")
+
+
+def _bytes_cacheados(clave, generar, max_mb=MAX_MB_EXPORTACIONES):
+    with _CANDADO:
+        if clave in _ARCHIVOS:
+            _ARCHIVOS.move_to_end(clave)
+            return _ARCHIVOS[clave]
+
+    datos = generar()
+
+    with _CANDADO:
+        _ARCHIVOS[clave] = datos
+        while len(_ARCHIVOS) > 1 and sum(len(archivo) for archivo in _ARCHIVOS.values()) > max_mb * 1e6:
+            _ARCHIVOS.popitem(last=False)
+    return datos
+
+
+def exportar_dataframe(df, huella, formato='csv'):
+    """
+    Bytes del DataFrame en el formato pedido; se genera una vez por (huella, formato).
+
+    Args:
+        df (pd.DataFrame): Datos a exportar
+        huella (str): Huella de contenido de df
+        formato (str): Clave de FORMATOS_EXPORTACION
+    """
+    def generar():
+        destino = io.BytesIO()
+        escribir_dataframe(df, destino, formato)
+        return destino.getvalue()
+
+    return _bytes_cacheados((huella, formato), generar)
+
+
+def huella_reportes(resultados):
+    """
+    Huella de los reportes de limpieza: la del pipeline más los perfiles
+    exactos aún pendientes (al incorporarlos cambian las métricas).
+    """
+    return f"{resultados['huella']}:{len(resultados.get('perfiles_pendientes', {}))}"
+
+
+def exportar_paquete(resultados):
+    """
+    ZIP con los tres datasets limpios (CSV), el reporte de limpieza y las
+    justificaciones. Cada miembro se escribe por bloques directamente al ZIP.
+    """
+    def generar():
+        destino = io.BytesIO()
+        with zipfile.ZipFile(destino, 'w', compression=zipfile.ZIP_DEFLATED) as paquete:
+            archivos = {f'{nombre}_limpio.csv': df for nombre, df in resultados['dataframes'].items()}
+            archivos['reporte_limpieza_techlogistics.csv'] = generar_reporte_limpieza(resultados)
+            archivos['justificaciones_limpieza.csv'] = generar_justificaciones(resultados)
+            for nombre_archivo, df in archivos.items():
+                with paquete.open(nombre_archivo, 'w', force_zip64=True) as miembro:
+                    escribir_csv(df, miembro)
+        return destino.getvalue()
+
+    return _bytes_cacheados((huella_reportes(resultados), 'paquete'), generar)
+
+
+def limpiar_cache_exportaciones():
+    """Vacía la caché de archivos exportados."""
+    with _CANDADO:
+        _ARCHIVOS.clear()
@@ -0,0 +1,268 @@
+"""
+Filtros globales sobre la tabla de hechos
+La tabla de hechos está ordenada por Fecha_Venta, así un rango de fechas es
+un slice obtenido por búsqueda binaria. Las dimensiones tienen un bitmap
+(empaquetado) por valor que se combinan con OR dentro de la dimensión y AND
+entre dimensiones, sin volver a recorrer las columnas de texto. El inventario
+tiene sus propios bitmaps (Categoria, Bodega_Origen); los filtros de ventas
+(fechas, ciudad, canal) lo restringen a los SKUs vendidos en la vista.
+"""
+
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from ..data_cleaning.indices import construir_indice_claves, pertenece
+from .cubo import construir_cubo, distintos_por_dimension
+from .histogramas import calcular_histogramas
+
+
+COLUMNA_FECHA = 'Fecha_Venta'
+
+DIMENSIONES_FILTRO = ['Ciudad_Destino', 'Canal_Venta', 'Categoria', 'Bodega_Origen']
+
+# Dimensiones que son columnas del inventario (el resto se filtra por SKU vendido)
+DIMENSIONES_INVENTARIO = ['Categoria', 'Bodega_Origen']
+
+# Índices de filtros / vistas filtradas que se mantienen en memoria
+MAX_INDICES = 2
+MAX_VISTAS = 8
+
+_INDICES = OrderedDict()
+_VISTAS = OrderedDict()
+_CANDADO = threading.Lock()
+
+
+def _memorizar(cache, clave, maximo, calcular):
+    with _CANDADO:
+        if clave in cache:
+            cache.move_to_end(clave)
+            return cache[clave]
+    valor = calcular()
+    with _CANDADO:
+        cache[clave] = valor
+        while len(cache) > maximo:
+            cache.popitem(last=False)
+    return valor
+
+
+def _bitmaps_dimensiones(df, dimensiones):
+    """Valores y un bitmap empaquetado (np.packbits) por valor de cada dimensión presente en df."""
+    valores_por_dimension, bitmaps_por_dimension = {}, {}
+    for dimension in dimensiones:
+        if dimension not in df.columns:
+            continue
+        columna = df[dimension]
+        if isinstance(columna.dtype, pd.CategoricalDtype):
+            codigos, valores = columna.cat.codes.to_numpy(), columna.cat.categories
+        else:
+            codigos, valores = pd.factorize(columna, sort=True)
+        valores_por_dimension[dimension] = [str(valor) for valor in valores]
+        bitmaps_por_dimension[dimension] = {
+            str(valor): np.packbits(codigos == codigo) for codigo, valor in enumerate(valores)
+        }
+    return valores_por_dimension, bitmaps_por_dimension
+
+
+def construir_indice_filtros(df_hechos, dimensiones=None, df_inventario=None):
+    """
+    Índice para filtrar la tabla de hechos (debe venir ordenada por Fecha_Venta)
+    y, si se recibe, el inventario.
+
+    Returns:
+        dict: 'filas', 'fechas' (datetime64 ordenado), 'valores' {dim: lista de
+        valores}, 'bitmaps' {dim: {valor: bitmap empaquetado (np.packbits)}} e
+        'inventario' ({'filas', 'bitmaps'} de DIMENSIONES_INVENTARIO, o None)
+    """
+    fechas = df_hechos[COLUMNA_FECHA].to_numpy(dtype='datetime64[ns]')
+    nulas = np.isnat(fechas)
+    validas = fechas[~nulas]
+    if nulas[:len(validas)].any() or np.any(validas[1:] < validas[:-1]):
+        raise ValueError("La tabla de hechos debe estar ordenada por Fecha_Venta (nulos al final)")
+
+    valores, bitmaps = _bitmaps_dimensiones(df_hechos, dimensiones or DIMENSIONES_FILTRO)
+    indice = {'filas': len(df_hechos), 'fechas': fechas, 'valores': valores, 'bitmaps': bitmaps, 'inventario': None}
+    if df_inventario is not None:
+        indice['inventario'] = {
+            'filas': len(df_inventario),
+            'bitmaps': _bitmaps_dimensiones(df_inventario, DIMENSIONES_INVENTARIO)[1]
+        }
+    return indice
+
+
+def normalizar_filtro(indice, filtro):
+    """
+    Deja solo las condiciones que realmente restringen filas: sin fechas que
+    cubren todo el rango ni dimensiones sin selección o con todos los valores.
+
+    Returns:
+        dict: filtro normalizado ({} si no filtra nada)
+    """
+    filtro = filtro or {}
+    normalizado = {}
+
+    fechas = indice['fechas']
+    validas = fechas[~np.isnat(fechas)]
+    if len(validas):
+        minimo, maximo = pd.Timestamp(validas[0]).normalize(), pd.Timestamp(validas[-1]).normalize()
+        inicio, fin = filtro.get('fecha_inicio'), filtro.get('fecha_fin')
+        if inicio is not None and pd.Timestamp(inicio) > minimo:
+            normalizado['fecha_inicio'] = str(pd.Timestamp(inicio).date())
+        if fin is not None and pd.Timestamp(fin) < maximo:
+            normalizado['fecha_fin'] = str(pd.Timestamp(fin).date())
+
+    for dimension, valores_indice in indice['valores'].items():
+        seleccion = sorted({str(valor) for valor in filtro.get(dimension) or []} & set(valores_indice))
+        if seleccion and len(seleccion) < len(valores_indice):
+            normalizado[dimension] = seleccion
+    return normalizado
+
+
+def rango_fechas(indice, fecha_inicio=None, fecha_fin=None):
+    """Slice [inicio, fin) de filas con fecha en el rango (fin incluye todo el día)."""
+    fechas = indice['fechas']
+    inicio = 0
+    fin = indice['filas']
+    if fecha_inicio is not None:
+        inicio = int(np.searchsorted(fechas, np.datetime64(pd.Timestamp(fecha_inicio), 'ns'), side='left'))
+    if fecha_fin is not None:
+        limite = pd.Timestamp(fecha_fin).normalize() + pd.Timedelta(days=1)
+        fin = int(np.searchsorted(fechas, np.datetime64(limite, 'ns'), side='left'))
+    return inicio, max(inicio, fin)
+
+
+def _bitmap_filtro(bitmaps_por_dimension, filtro, filas):
+    """
+    OR de los bitmaps seleccionados dentro de cada dimensión y AND entre
+    dimensiones (None si el filtro no restringe ninguna de ellas).
+    """
+    bitmap = None
+    for dimension, bitmaps in bitmaps_por_dimension.items():
+        if not filtro.get(dimension):
+            continue
+        seleccion = [bitmaps[valor] for valor in filtro[dimension] if valor in bitmaps]
+        seleccion = np.bitwise_or.reduce(seleccion) if seleccion else np.zeros(-(-filas // 8), dtype=np.uint8)
+        bitmap = seleccion if bitmap is None else bitmap & seleccion
+    return bitmap
+
+
+def filas_filtradas(indice, filtro):
+    """
+    Filas de la tabla de hechos que cumplen el filtro (normalizado).
+
+    Returns:
+        slice | np.ndarray: un slice si solo hay filtro de fechas, si no las
+        posiciones de las filas seleccionadas
+    """
+    inicio, fin = rango_fechas(indice, filtro.get('fecha_inicio'), filtro.get('fecha_fin'))
+
+    bitmap = _bitmap_filtro(indice['bitmaps'], filtro, indice['filas'])
+    if bitmap is None:
+        return slice(inicio, fin)
+
+    mascara = np.unpackbits(bitmap, count=indice['filas']).view(bool)
+    return inicio + np.flatnonzero(mascara[inicio:fin])
+
+
+def filas_inventario(indice, filtro, df_inventario, df_hechos_filtrada):
+    """
+    Filas del inventario que cumplen el filtro (normalizado): Categoria y
+    Bodega_Origen con los bitmaps del inventario; fechas, ciudad y canal
+    dejan solo los SKUs con ventas en df_hechos_filtrada.
+
+    Returns:
+        slice | np.ndarray: slice(None) si el filtro no restringe el
+        inventario, si no las posiciones de las filas seleccionadas
+    """
+    inventario = indice['inventario']
+    bitmap = _bitmap_filtro(inventario['bitmaps'], filtro, inventario['filas'])
+    mascara = None if bitmap is None else np.unpackbits(bitmap, count=inventario['filas']).view(bool)
+
+    filtra_ventas = any(
+        filtro.get(condicion)
+        for condicion in ['fecha_inicio', 'fecha_fin'] + [d for d in DIMENSIONES_FILTRO if d not in inventario['bitmaps']]
+    )
+    if filtra_ventas:
+        vendidos = pertenece(construir_indice_claves(df_hechos_filtrada['SKU_ID']), df_inventario['SKU_ID']).to_numpy()
+        mascara = vendidos if mascara is None else mascara & vendidos
+
+    if mascara is None:
+        return slice(None)
+    return np.flatnonzero(mascara)
+
+
+def clave_filtro(filtro):
+    """Clave estable de un filtro normalizado."""
+    return hashlib.sha256(json.dumps(filtro, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+def indice_filtros(resultados):
+    """Índice de filtros de los resultados del pipeline (se construye una vez por huella)."""
+    def calcular():
+        return construir_indice_filtros(
+            resultados['analitica']['tabla_hechos'],
+            df_inventario=resultados['dataframes']['inventario']
+        )
+
+    return _memorizar(_INDICES, resultados['huella'], MAX_INDICES, calcular)
+
+
+def vista_filtrada(resultados, filtro):
+    """
+    Tablas del pipeline restringidas al filtro global.
+
+    Sin filtro efectivo retorna las tablas completas del pipeline. Con filtro,
+    filtra la tabla de hechos con el índice y recalcula el cubo, los distintos
+    por categoría y los histogramas; transacciones y feedback se toman por
+    posición (Fila_Transaccion / Fila_Feedback) y el inventario con
+    filas_inventario. El índice y las vistas se guardan por huella del
+    pipeline en LRUs del módulo; resultados no se modifica.
+
+    Returns:
+        dict: {'filtro', 'huella', 'dataframes', 'analitica'}
+    """
+    analitica = resultados['analitica']
+    indice = indice_filtros(resultados)
+
+    filtro = normalizar_filtro(indice, filtro)
+    if not filtro:
+        return {
+            'filtro': filtro,
+            'huella': resultados['huella'],
+            'dataframes': resultados['dataframes'],
+            'analitica': analitica
+        }
+
+    clave = clave_filtro(filtro)
+
+    def calcular():
+        filas = filas_filtradas(indice, filtro)
+        df_hechos = analitica['tabla_hechos']
+        hechos = df_hechos.iloc[filas]
+
+        dataframes = dict(resultados['dataframes'])
+        posiciones_transacciones = np.unique(hechos['Fila_Transaccion'].to_numpy())
+        posiciones_feedback = np.unique(hechos['Fila_Feedback'].dropna().to_numpy(dtype='int64'))
+        dataframes['transacciones'] = dataframes['transacciones'].iloc[posiciones_transacciones]
+        dataframes['feedback'] = dataframes['feedback'].iloc[posiciones_feedback]
+        dataframes['inventario'] = dataframes['inventario'].iloc[
+            filas_inventario(indice, filtro, dataframes['inventario'], hechos)
+        ]
+
+        return {
+            'filtro': filtro,
+            'huella': f"{resultados['huella']}:{clave}",
+            'dataframes': dataframes,
+            'analitica': {
+                'tabla_hechos': hechos,
+                'cubo': construir_cubo(hechos),
+                'skus_por_categoria': distintos_por_dimension(hechos, 'Categoria', 'SKU_ID'),
+                'histogramas': calcular_histogramas(dataframes)
+            }
+        }
+
+    return _memorizar(_VISTAS, (resultados['huella'], clave), MAX_VISTAS, calcular)
@@ -0,0 +1,59 @@
+"""
+Tabla de hechos analítica
+Une transacciones con inventario y feedback y agrega las columnas derivadas
+que usan los dashboards. Se materializa una vez por ejecución del pipeline.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+FECHA_REFERENCIA = pd.Timestamp('2026-01-31')
+
+
+def construir_tabla_hechos(df_transacciones, df_inventario, df_feedback):
+    """
+    Construye la tabla de hechos (merges left del dashboard: una fila por
+    transacción y registro de feedback asociado, así una transacción con
+    varios feedbacks aparece varias veces),
+    ordenada por Fecha_Venta para filtrar rangos de fechas por búsqueda binaria.
+
+    Columnas derivadas:
+    - COGS, Margen_Total, Margen_Pct: rentabilidad por venta
+    - Dias_Sin_Revisar: días entre Ultima_Revision y la fecha de referencia
+    - Ticket_Numerico: ticket de soporte como 0/1
+    - Mes_Venta: primer día del mes de Fecha_Venta (para agregaciones temporales)
+    - Fila_Transaccion, Fila_Feedback: posición de la fila de origen en
+      df_transacciones / df_feedback (Fila_Feedback nulo si no hay feedback)
+
+    Returns:
+        pd.DataFrame: tabla de hechos con dtypes compactos
+    """
+    if 'Transaccion_ID' not in df_feedback.columns or 'Transaccion_ID' not in df_transacciones.columns:
+        raise ValueError("No se puede unir Feedback: Falta Transaccion_ID")
+
+    df_hechos = (
+        df_transacciones
+        .assign(Fila_Transaccion=np.arange(len(df_transacciones), dtype='int32'))
+        .merge(df_inventario, on='SKU_ID', how='left')
+        .merge(
+            df_feedback.assign(Fila_Feedback=pd.array(np.arange(len(df_feedback)), dtype='Int32')),
+            on='Transaccion_ID',
+            how='left'
+        )
+    )
+
+    # Rentabilidad
+    df_hechos['COGS'] = df_hechos['Costo_Unitario_USD'] * df_hechos['Cantidad_Vendida']
+    df_hechos['Margen_Total'] = df_hechos['Precio_Venta_Final'] - df_hechos['COGS']
+    df_hechos['Margen_Pct'] = (df_hechos['Margen_Total'] / df_hechos['Precio_Venta_Final']) * 100
+
+    # Riesgo operativo
+    ultima_revision = pd.to_datetime(df_hechos['Ultima_Revision'], errors='coerce')
+    df_hechos['Dias_Sin_Revisar'] = (FECHA_REFERENCIA - ultima_revision).dt.days
+    df_hechos['Ticket_Numerico'] = df_hechos['Ticket_Soporte_Abierto'].astype('boolean').fillna(False).astype('int8')
+
+    # Dimensión temporal
+    df_hechos['Mes_Venta'] = df_hechos['Fecha_Venta'].dt.to_period('M').dt.to_timestamp()
+
+    return df_hechos.sort_values('Fecha_Venta', kind='stable', na_position='last', ignore_index=True)
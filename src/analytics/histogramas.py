@@ -0,0 +1,67 @@
+"""
+Histogramas precalculados (conteos por bin) de los datasets limpios
+Se calculan una vez por ejecución del pipeline; los gráficos se dibujan a
+partir de los conteos, así el tamaño enviado al navegador no depende del
+número de filas.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Variable -> dataset, ancho de bin e inicio del primer bin
+# (inicio None: múltiplo del ancho por debajo del mínimo)
+HISTOGRAMAS = {
+    'Rating_Producto': {'dataset': 'feedback', 'ancho': 1.0, 'inicio': 0.5},
+    'Satisfaccion_NPS': {'dataset': 'feedback', 'ancho': 10.0, 'inicio': -100.0},
+    'Edad_Cliente': {'dataset': 'feedback', 'ancho': 5.0, 'inicio': None},
+    'Tiempo_Entrega_Real': {'dataset': 'transacciones', 'ancho': 1.0, 'inicio': 0.5}
+}
+
+
+def calcular_histograma(valores, ancho, inicio=None):
+    """
+    Conteos por bins de ancho fijo (el último bin incluye su borde derecho).
+
+    Returns:
+        pd.DataFrame: columnas bin_inicio, bin_fin, conteo (solo no nulos)
+    """
+    valores = pd.Series(valores, copy=False).dropna().to_numpy(dtype='float64')
+    if len(valores) == 0:
+        return pd.DataFrame({'bin_inicio': [], 'bin_fin': [], 'conteo': []}).astype({'conteo': 'int64'})
+
+    minimo, maximo = valores.min(), valores.max()
+    if inicio is None:
+        inicio = np.floor(minimo / ancho) * ancho
+    inicio = min(inicio, np.floor(minimo / ancho) * ancho)
+    n_bins = max(int(np.ceil((maximo - inicio) / ancho)), 1)
+    bordes = inicio + ancho * np.arange(n_bins + 1)
+
+    conteos, _ = np.histogram(valores, bins=bordes)
+    return pd.DataFrame({
+        'bin_inicio': bordes[:-1],
+        'bin_fin': bordes[1:],
+        'conteo': conteos.astype('int64')
+    })
+
+
+def calcular_histogramas(dataframes, especificaciones=None):
+    """
+    Calcula los histogramas configurados sobre {dataset: DataFrame}.
+    Omite las variables cuyo dataset o columna no existen.
+
+    Returns:
+        pd.DataFrame: una fila por (variable, bin) con bin_inicio, bin_fin y conteo
+    """
+    tablas = []
+    for variable, spec in (especificaciones or HISTOGRAMAS).items():
+        df = dataframes.get(spec['dataset'])
+        if df is None or variable not in df.columns:
+            continue
+        tabla = calcular_histograma(df[variable], spec['ancho'], spec.get('inicio'))
+        tabla.insert(0, 'variable', variable)
+        tablas.append(tabla)
+
+    if not tablas:
+        return pd.DataFrame(columns=['variable', 'bin_inicio', 'bin_fin', 'conteo'])
+    return pd.concat(tablas, ignore_index=True)
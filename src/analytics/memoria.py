@@ -0,0 +1,91 @@
+"""
+Reporte de memoria retenida por dataset
+Con copy-on-write los DataFrames limpios comparten los buffers de las columnas
+que la limpieza no modificó; este reporte cuenta cada buffer una sola vez.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _buffers_columna(serie):
+    """
+    Retorna los buffers de memoria de una columna como pares (dirección, bytes).
+    Dos columnas que comparten memoria producen las mismas direcciones.
+    """
+    arreglo = serie.array
+
+    if isinstance(serie.dtype, pd.CategoricalDtype):
+        codigos = arreglo.codes
+        buffers = [(codigos.__array_interface__['data'][0], codigos.nbytes)]
+        categorias = arreglo.categories
+        buffers.append((id(categorias), int(categorias.memory_usage(deep=True))))
+        return buffers
+
+    if hasattr(arreglo, '__arrow_array__'):
+        try:
+            columna_arrow = arreglo.__arrow_array__()
+            return [
+                (buffer.address, buffer.size)
+                for fragmento in columna_arrow.chunks
+                for buffer in fragmento.buffers()
+                if buffer is not None
+            ]
+        except Exception:
+            pass
+
+    if isinstance(serie.dtype, np.dtype) and serie.dtype.kind in 'biufcmM':
+        valores = serie.to_numpy(copy=False)
+        return [(valores.__array_interface__['data'][0], valores.nbytes)]
+
+    return [(id(arreglo), int(serie.memory_usage(deep=True, index=False)))]
+
+
+def _buffers_dataframe(df):
+    buffers = {}
+    for columna in df.columns:
+        for direccion, tamano in _buffers_columna(df[columna]):
+            buffers[direccion] = max(tamano, buffers.get(direccion, 0))
+    return buffers
+
+
+def bytes_unicos(dataframes):
+    """Bytes de un conjunto de DataFrames contando una sola vez los buffers compartidos."""
+    buffers = {}
+    for df in dataframes:
+        for direccion, tamano in _buffers_dataframe(df).items():
+            buffers[direccion] = max(tamano, buffers.get(direccion, 0))
+    return int(sum(buffers.values()))
+
+
+def reporte_memoria(originales, limpios):
+    """
+    Compara la memoria de los datasets originales y limpios.
+
+    Args:
+        originales (dict): {nombre: DataFrame original}
+        limpios (dict): {nombre: DataFrame limpio}
+
+    Returns:
+        pd.DataFrame: bytes por dataset (original, limpio, compartidos y
+        total realmente retenido contando cada buffer una vez)
+    """
+    filas = []
+    for nombre in limpios:
+        buffers_original = _buffers_dataframe(originales[nombre]) if nombre in originales else {}
+        buffers_limpio = _buffers_dataframe(limpios[nombre])
+
+        compartidos = buffers_original.keys() & buffers_limpio.keys()
+        bytes_original = sum(buffers_original.values())
+        bytes_limpio = sum(buffers_limpio.values())
+        bytes_compartidos = sum(buffers_limpio[direccion] for direccion in compartidos)
+
+        filas.append({
+            'Dataset': nombre.capitalize(),
+            'MB_Original': round(bytes_original / 1e6, 3),
+            'MB_Limpio': round(bytes_limpio / 1e6, 3),
+            'MB_Compartidos': round(bytes_compartidos / 1e6, 3),
+            'MB_Retenidos': round((bytes_original + bytes_limpio - bytes_compartidos) / 1e6, 3)
+        })
+
+    return pd.DataFrame(filas)
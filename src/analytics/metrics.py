@@ -2,39 +2,27 @@
 Métricas de calidad de datos y Health Score
 """
 
+from statistics import NormalDist
+
 import numpy as np
 import pandas as pd
 
+from ..data_cleaning.outliers import contar_outliers
 
-def detectar_outliers_score(df):
-    """
-    Detecta outliers en columnas numéricas usando IQR y retorna
-    un score de penalización (máximo 30 puntos).
-    """
-    columnas_numericas = df.select_dtypes(include=[np.number]).columns
-    
-    if len(columnas_numericas) == 0:
-        return 0
-    
-    total_outliers = 0
-    total_valores = 0
-    
-    for col in columnas_numericas:
-        datos = df[col].dropna()
-        if len(datos) == 0:
-            continue
-            
-        Q1 = datos.quantile(0.25)
-        Q3 = datos.quantile(0.75)
-        IQR = Q3 - Q1
-        
-        limite_inferior = Q1 - 1.5 * IQR
-        limite_superior = Q3 + 1.5 * IQR
-        
-        outliers = ((datos < limite_inferior) | (datos > limite_superior)).sum()
-        total_outliers += outliers
-        total_valores += len(datos)
-    
+
+# Filas de la muestra en el modo aproximado
+TAMANO_MUESTRA = 50_000
+
+# Claves del perfil que forman las métricas de calidad
+CLAVES_METRICAS = [
+    'dataset', 'total_registros', 'total_columnas', 'nulos_por_columna',
+    'porcentaje_nulidad_por_columna', 'columnas_con_nulos', 'total_nulos',
+    'registros_duplicados', 'porcentaje_duplicados', 'health_score'
+]
+
+
+def penalizacion_outliers(total_outliers, total_valores):
+    """Penalización por outliers (máximo 30 puntos) a partir de los conteos."""
     if total_valores == 0:
         return 0
     
@@ -44,8 +32,23 @@ def detectar_outliers_score(df):
     return penalizacion
 
 
-def calcular_health_score(df):
+def detectar_outliers_score(df, aproximado=False, tamano_muestra=None):
     """
+    Detecta outliers en columnas numéricas usando IQR y retorna
+    un score de penalización (máximo 30 puntos).
+    Con aproximado=True se calcula sobre una muestra aleatoria.
+    """
+    if aproximado:
+        df = muestrear_dataset(df, tamano_muestra or TAMANO_MUESTRA)
+    conteo = contar_outliers(df)
+    return penalizacion_outliers(conteo['outliers'].sum(), conteo['valores'].sum())
+
+
+def perfil_desde_conteos(nombre_dataset, total_registros, nulos_por_columna,
+                         registros_duplicados, total_outliers, total_valores):
+    """
+    Construye el perfil de calidad (métricas + Health Score) a partir de los
+    conteos agregados, sin tocar los datos:
     Health Score = 100 - penalizaciones
     
     Penalizaciones:
@@ -53,38 +56,188 @@ def calcular_health_score(df):
     - Duplicados: pesa 30%
     - Outliers extremos: pesa 30%
     """
+    total_columnas = len(nulos_por_columna)
+    
     # Penalización por nulidad (máximo 40 puntos)
-    total_celdas = len(df) * len(df.columns)
-    total_nulos = df.isnull().sum().sum()
+    total_celdas = total_registros * total_columnas
+    total_nulos = nulos_por_columna.sum()
     nulidad_promedio = (total_nulos / total_celdas) * 100 if total_celdas > 0 else 0
     penalizacion_nulos = min(nulidad_promedio * 4, 40)  # Escalar para que sea más sensible
     
     # Penalización por duplicados (máximo 30 puntos)
-    duplicados_pct = (df.duplicated().sum() / len(df)) * 100 if len(df) > 0 else 0
+    duplicados_pct = (registros_duplicados / total_registros) * 100 if total_registros > 0 else 0
     penalizacion_duplicados = min(duplicados_pct, 30)
     
-    # Penalización por outliers (máximo 30 puntos)
-    penalizacion_outliers = detectar_outliers_score(df)
+    penalizacion_atipicos = penalizacion_outliers(total_outliers, total_valores)
     
-    health_score = 100 - (penalizacion_nulos + penalizacion_duplicados + penalizacion_outliers)
+    health_score = 100 - (penalizacion_nulos + penalizacion_duplicados + penalizacion_atipicos)
     
-    return max(0, round(health_score, 2))
+    return {
+        'dataset': nombre_dataset,
+        'total_registros': total_registros,
+        'total_columnas': total_columnas,
+        'nulos_por_columna': nulos_por_columna.to_dict(),
+        'porcentaje_nulidad_por_columna': (
+            (nulos_por_columna / total_registros * 100).round(2) if total_registros > 0 else nulos_por_columna * 0.0
+        ).to_dict(),
+        'columnas_con_nulos': nulos_por_columna.index[nulos_por_columna > 0].tolist(),
+        'total_nulos': total_nulos,
+        'registros_duplicados': registros_duplicados,
+        'porcentaje_duplicados': round((registros_duplicados / total_registros * 100), 2) if total_registros > 0 else 0,
+        'penalizaciones': {
+            'nulos': penalizacion_nulos,
+            'duplicados': penalizacion_duplicados,
+            'outliers': penalizacion_atipicos
+        },
+        'health_score': max(0, round(health_score, 2))
+    }
 
 
-def calcular_metricas_calidad(df, nombre_dataset):
+def perfilar_dataset(df, nombre_dataset=None):
     """
-    Calcula métricas de calidad completas para un DataFrame.
+    Perfil de calidad de un DataFrame en una sola pasada.
+    
+    Calcula nulos por columna, duplicados y outliers una vez y deriva de ellos
+    todas las métricas de calidad y el Health Score (ver perfil_desde_conteos).
     """
-    metricas = {
-        'dataset': nombre_dataset,
-        'total_registros': len(df),
-        'total_columnas': len(df.columns),
-        'nulos_por_columna': df.isnull().sum().to_dict(),
-        'porcentaje_nulidad_por_columna': (df.isnull().sum() / len(df) * 100).round(2).to_dict(),
-        'columnas_con_nulos': df.columns[df.isnull().any()].tolist(),
-        'total_nulos': df.isnull().sum().sum(),
-        'registros_duplicados': df.duplicated().sum(),
-        'porcentaje_duplicados': round((df.duplicated().sum() / len(df) * 100), 2),
-        'health_score': calcular_health_score(df)
+    conteo_outliers = contar_outliers(df)
+    return perfil_desde_conteos(
+        nombre_dataset,
+        total_registros=len(df),
+        nulos_por_columna=df.isnull().sum(),
+        registros_duplicados=df.duplicated().sum(),
+        total_outliers=conteo_outliers['outliers'].sum(),
+        total_valores=conteo_outliers['valores'].sum()
+    )
+
+
+# =============================================================================
+# MODO APROXIMADO (MUESTREO)
+# =============================================================================
+
+def muestrear_dataset(df, tamano_muestra=TAMANO_MUESTRA, estrato=None, semilla=42):
+    """
+    Muestra aleatoria simple sin reemplazo, o estratificada proporcional
+    si se indica la columna 'estrato'.
+    """
+    if tamano_muestra >= len(df):
+        return df
+    if estrato is None:
+        return df.sample(n=tamano_muestra, random_state=semilla)
+    fraccion = tamano_muestra / len(df)
+    return (
+        df.groupby(estrato, observed=True, dropna=False, group_keys=False)
+        .sample(frac=fraccion, random_state=semilla)
+    )
+
+
+def _intervalo_proporcion(p, n, total, z):
+    """Intervalo normal de una proporción con corrección por población finita."""
+    if n == 0:
+        return 0.0, 0.0
+    correccion = np.sqrt(max(total - n, 0) / max(total - 1, 1))
+    margen = z * np.sqrt(p * (1 - p) / n) * correccion
+    return max(p - margen, 0.0), min(p + margen, 1.0)
+
+
+def perfilar_dataset_aproximado(df, nombre_dataset=None, tamano_muestra=TAMANO_MUESTRA,
+                                confianza=0.95, estrato=None, semilla=42):
+    """
+    Perfil de calidad estimado sobre una muestra, con intervalos de confianza.
+    
+    - Nulidad: media de la fracción de nulos por fila (error estándar por filas)
+    - Duplicados: pares duplicados en la muestra escalados por N(N-1)/(n(n-1));
+      asume que los duplicados son mayoritariamente pares
+    - Outliers: proporción de valores fuera de los límites IQR de la muestra
+    
+    Cada penalización se reporta con su intervalo en perfil['intervalos'] y el
+    Health Score con el intervalo resultante (conservador: suma de extremos).
+    Si la muestra cubre todo el dataset se retorna el perfil exacto.
+    """
+    total_registros = len(df)
+    muestra = muestrear_dataset(df, tamano_muestra, estrato, semilla)
+    n = len(muestra)
+    
+    if n >= total_registros:
+        perfil = perfilar_dataset(df, nombre_dataset)
+        perfil['intervalos'] = {
+            clave: (valor, valor)
+            for clave, valor in [*perfil['penalizaciones'].items(), ('health_score', perfil['health_score'])]
+        }
+        perfil['tamano_muestra'] = n
+        return perfil
+    
+    z = NormalDist().inv_cdf(0.5 + confianza / 2)
+    factor = total_registros / n
+    
+    # Nulidad
+    nulos_muestra = muestra.isnull()
+    nulos_por_columna = (nulos_muestra.sum() * factor).round().astype('int64')
+    fraccion_fila = nulos_muestra.mean(axis=1).to_numpy()
+    correccion = np.sqrt((total_registros - n) / (total_registros - 1))
+    margen_nulos = z * fraccion_fila.std(ddof=1) / np.sqrt(n) * correccion if n > 1 else 0.0
+    nulidad = (fraccion_fila.mean() - margen_nulos, fraccion_fila.mean() + margen_nulos)
+    
+    # Duplicados
+    grupos = pd.Series(pd.util.hash_pandas_object(muestra, index=False)).value_counts()
+    pares = float((grupos * (grupos - 1) / 2).sum())
+    escala_pares = total_registros * (total_registros - 1) / (n * (n - 1)) if n > 1 else 0.0
+    margen_pares = z * np.sqrt(pares) if pares > 0 else z ** 2
+    registros_duplicados = int(round(min(pares * escala_pares, total_registros)))
+    duplicados = (
+        max(pares - margen_pares, 0.0) * escala_pares / total_registros,
+        min((pares + margen_pares) * escala_pares / total_registros, 1.0)
+    )
+    
+    # Outliers
+    conteo = contar_outliers(muestra)
+    total_outliers = conteo['outliers'].sum()
+    total_valores = conteo['valores'].sum()
+    proporcion = total_outliers / total_valores if total_valores else 0.0
+    valores_poblacion = total_valores * factor
+    outliers = _intervalo_proporcion(proporcion, total_valores, valores_poblacion, z)
+    
+    perfil = perfil_desde_conteos(
+        nombre_dataset,
+        total_registros=total_registros,
+        nulos_por_columna=nulos_por_columna,
+        registros_duplicados=registros_duplicados,
+        total_outliers=proporcion * valores_poblacion,
+        total_valores=valores_poblacion
+    )
+    
+    # Intervalos de cada penalización (mismas escalas que perfil_desde_conteos)
+    intervalos = {
+        'nulos': tuple(min(max(p, 0.0) * 100 * 4, 40) for p in nulidad),
+        'duplicados': tuple(min(p * 100, 30) for p in duplicados),
+        'outliers': tuple(min(p * 100 * 3, 30) for p in outliers)
     }
+    intervalos['health_score'] = (
+        max(0, round(100 - sum(alto for _, alto in intervalos.values()), 2)),
+        max(0, round(100 - sum(bajo for bajo, _ in intervalos.values()), 2))
+    )
+    perfil['intervalos'] = intervalos
+    perfil['tamano_muestra'] = n
+    return perfil
+
+
+def calcular_health_score(df, perfil=None, aproximado=False):
+    """
+    Health Score del dataset (ver perfilar_dataset).
+    Si ya se tiene el perfil se reutiliza en vez de recorrer los datos;
+    con aproximado=True se estima sobre una muestra (perfilar_dataset_aproximado).
+    """
+    if perfil is None:
+        perfil = perfilar_dataset_aproximado(df) if aproximado else perfilar_dataset(df)
+    return perfil['health_score']
+
+
+def calcular_metricas_calidad(df, nombre_dataset, perfil=None):
+    """
+    Calcula métricas de calidad completas para un DataFrame.
+    Si ya se tiene el perfil se reutiliza en vez de recorrer los datos.
+    """
+    perfil = perfil or perfilar_dataset(df, nombre_dataset)
+    metricas = {clave: perfil[clave] for clave in CLAVES_METRICAS}
+    metricas['dataset'] = nombre_dataset
     return metricas
@@ -0,0 +1,82 @@
+"""
+Planificador DAG para ejecutar etapas independientes del pipeline en paralelo
+"""
+
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+
+def _validar_dag(etapas):
+    """Verifica que las dependencias existan y que no haya ciclos."""
+    for nombre, etapa in etapas.items():
+        for dependencia in etapa.get('dependencias', []):
+            if dependencia not in etapas:
+                raise ValueError(f"La etapa '{nombre}' depende de '{dependencia}', que no existe")
+
+    visitadas, en_curso = set(), set()
+
+    def visitar(nombre):
+        if nombre in visitadas:
+            return
+        if nombre in en_curso:
+            raise ValueError(f"Ciclo de dependencias en la etapa '{nombre}'")
+        en_curso.add(nombre)
+        for dependencia in etapas[nombre].get('dependencias', []):
+            visitar(dependencia)
+        en_curso.discard(nombre)
+        visitadas.add(nombre)
+
+    for nombre in etapas:
+        visitar(nombre)
+
+
+def ejecutar_dag(etapas, max_workers=None):
+    """
+    Ejecuta un grafo de etapas respetando sus dependencias.
+
+    Cada etapa es {'funcion': callable, 'dependencias': [nombres]}; la función
+    recibe como argumentos posicionales los resultados de sus dependencias,
+    en el orden declarado. Las etapas sin dependencias pendientes corren en
+    paralelo en un pool de hilos (pandas/numpy liberan el GIL en la mayoría
+    de operaciones vectorizadas y no hay que serializar DataFrames).
+
+    Args:
+        etapas (dict): {nombre: etapa}
+        max_workers (int, optional): Hilos del pool (1 = ejecución secuencial)
+
+    Returns:
+        tuple: (resultados {nombre: valor}, tiempos {nombre: segundos})
+    """
+    _validar_dag(etapas)
+    max_workers = max_workers or min(len(etapas), os.cpu_count() or 1) or 1
+
+    resultados = {}
+    tiempos = {}
+    pendientes = dict(etapas)
+
+    def correr(nombre):
+        etapa = etapas[nombre]
+        argumentos = [resultados[dependencia] for dependencia in etapa.get('dependencias', [])]
+        inicio = time.perf_counter()
+        valor = etapa['funcion'](*argumentos)
+        return valor, time.perf_counter() - inicio
+
+    with ThreadPoolExecutor(max_workers=max_workers) as pool:
+        en_ejecucion = {}
+
+        while pendientes or en_ejecucion:
+            listas = [
+                nombre for nombre, etapa in pendientes.items()
+                if all(dependencia in resultados for dependencia in etapa.get('dependencias', []))
+            ]
+            for nombre in listas:
+                del pendientes[nombre]
+                en_ejecucion[pool.submit(correr, nombre)] = nombre
+
+            terminadas, _ = wait(en_ejecucion, return_when=FIRST_COMPLETED)
+            for futuro in terminadas:
+                nombre = en_ejecucion.pop(futuro)
+                resultados[nombre], tiempos[nombre] = futuro.result()
+
+    return resultados, tiempos
@@ -0,0 +1,258 @@
+"""
+Resúmenes de calidad combinables por lotes
+Permiten mantener el Health Score al día agregando lotes (chunks, cargas
+diarias) sin volver a recorrer el histórico: cada lote se resume una vez y
+los resúmenes se combinan.
+"""
+
+import numpy as np
+import pandas as pd
+
+from ..data_cleaning.outliers import matriz_numerica
+from .metrics import perfil_desde_conteos
+
+
+# Puntos máximos por columna en el sketch de cuantiles. Mientras no se supere,
+# el sketch guarda los valores exactos y los límites IQR coinciden con pandas.
+CAPACIDAD_CUANTILES = 20_000
+
+# Filas distintas que se guardan como hashes exactos antes de pasar a HyperLogLog
+LIMITE_HASHES_EXACTOS = 2_000_000
+
+# Precisión de HyperLogLog: 2**14 registros (~0.8% de error relativo)
+PRECISION_HLL = 14
+
+
+# =============================================================================
+# SKETCH DE CUANTILES
+# Puntos ordenados con peso; al superar la capacidad se compacta a puntos
+# equiespaciados en rango, así el tamaño no crece con el histórico.
+# =============================================================================
+
+def _sketch_desde_valores(valores):
+    valores = np.sort(valores[~np.isnan(valores)])
+    return {'valores': valores, 'pesos': np.ones(len(valores))}
+
+
+def _compactar_sketch(sketch, capacidad):
+    valores, pesos = sketch['valores'], sketch['pesos']
+    if len(valores) <= capacidad:
+        return sketch
+
+    total = pesos.sum()
+    rangos = (np.arange(capacidad) + 0.5) * total / capacidad
+    posiciones = np.searchsorted(np.cumsum(pesos), rangos)
+    return {
+        'valores': valores[np.minimum(posiciones, len(valores) - 1)],
+        'pesos': np.full(capacidad, total / capacidad)
+    }
+
+
+def _combinar_sketches(a, b, capacidad):
+    valores = np.concatenate([a['valores'], b['valores']])
+    pesos = np.concatenate([a['pesos'], b['pesos']])
+    orden = np.argsort(valores, kind='stable')
+    return _compactar_sketch({'valores': valores[orden], 'pesos': pesos[orden]}, capacidad)
+
+
+def _cuartiles_sketch(sketch):
+    valores, pesos = sketch['valores'], sketch['pesos']
+    if len(valores) == 0:
+        return np.nan, np.nan
+    if np.all(pesos == 1):
+        # Valores exactos: misma interpolación lineal que pandas
+        q1, q3 = np.quantile(valores, [0.25, 0.75])
+        return q1, q3
+    rangos = (np.cumsum(pesos) - pesos / 2) / pesos.sum()
+    q1, q3 = np.interp([0.25, 0.75], rangos, valores)
+    return q1, q3
+
+
+def _contar_fuera_sketch(sketch, limite_inferior, limite_superior):
+    valores, pesos = sketch['valores'], sketch['pesos']
+    fuera = (valores < limite_inferior) | (valores > limite_superior)
+    return pesos[fuera].sum(), pesos.sum()
+
+
+# =============================================================================
+# DUPLICADOS: HASHES EXACTOS O HYPERLOGLOG
+# Los hashes exactos se guardan en bloques ordenados y disjuntos; un lote
+# nuevo solo busca sus hashes en los bloques y se agrega como bloque, sin
+# volver a unir todo el histórico.
+# =============================================================================
+
+def _hashes_filas(df):
+    return pd.util.hash_pandas_object(df, index=False).to_numpy()
+
+
+def _registros_hll(hashes):
+    """Registros HyperLogLog (máximo de ceros iniciales + 1 por cubeta)."""
+    m = 1 << PRECISION_HLL
+    hashes = hashes.astype(np.uint64)
+    cubetas = (hashes >> np.uint64(64 - PRECISION_HLL)).astype(np.int64)
+    resto = hashes << np.uint64(PRECISION_HLL)
+
+    # Ceros iniciales de 64 bits por búsqueda binaria vectorizada
+    ceros = np.zeros(len(hashes), dtype=np.int64)
+    for salto in (32, 16, 8, 4, 2, 1):
+        sin_bits = (resto >> np.uint64(64 - salto)) == 0
+        ceros += salto * sin_bits
+        resto = np.where(sin_bits, resto << np.uint64(salto), resto)
+    rho = np.minimum(ceros + 1, 64 - PRECISION_HLL + 1).astype(np.uint8)
+
+    registros = np.zeros(m, dtype=np.uint8)
+    np.maximum.at(registros, cubetas, rho)
+    return registros
+
+
+def _estimar_hll(registros):
+    m = len(registros)
+    alfa = 0.7213 / (1 + 1.079 / m)
+    estimacion = alfa * m * m / np.sum(np.power(2.0, -registros.astype(float)))
+    vacios = np.count_nonzero(registros == 0)
+    if estimacion <= 2.5 * m and vacios > 0:
+        estimacion = m * np.log(m / vacios)
+    return estimacion
+
+
+def _quitar_presentes(hashes, bloques):
+    """Hashes (ordenados) que no están en ningún bloque, por búsqueda binaria."""
+    for bloque in bloques:
+        if not len(hashes):
+            break
+        posiciones = np.minimum(np.searchsorted(bloque, hashes), len(bloque) - 1)
+        hashes = hashes[bloque[posiciones] != hashes]
+    return hashes
+
+
+def _agregar_bloque(bloques, nuevos):
+    """
+    Agrega un bloque ordenado (disjunto de los existentes). Los bloques de
+    tamaño parecido se fusionan, así hay O(log n) bloques y cada hash se
+    reordena O(log n) veces en total, no en cada lote.
+    """
+    bloques = list(bloques)
+    if len(nuevos):
+        bloques.append(nuevos)
+    while len(bloques) > 1 and len(bloques[-2]) <= 2 * len(bloques[-1]):
+        ultimo = bloques.pop()
+        bloques[-1] = np.sort(np.concatenate([bloques[-1], ultimo]))
+    return bloques
+
+
+def _distintos_desde_hashes(hashes):
+    """hashes: únicos y ordenados."""
+    if len(hashes) <= LIMITE_HASHES_EXACTOS:
+        return {'bloques': [hashes] if len(hashes) else [], 'hll': None}
+    return {'bloques': None, 'hll': _registros_hll(hashes)}
+
+
+def _combinar_distintos(a, b):
+    if a['bloques'] is not None and b['bloques'] is not None:
+        if _contar_distintos(a) < _contar_distintos(b):
+            a, b = b, a
+        bloques = a['bloques']
+        for bloque in b['bloques']:
+            bloques = _agregar_bloque(bloques, _quitar_presentes(bloque, a['bloques']))
+        if sum(len(bloque) for bloque in bloques) <= LIMITE_HASHES_EXACTOS:
+            return {'bloques': bloques, 'hll': None}
+        return {'bloques': None, 'hll': _registros_hll(np.concatenate(bloques))}
+
+    registros = [
+        d['hll'] if d['hll'] is not None else _registros_hll(np.concatenate(d['bloques'] or [np.empty(0, np.uint64)]))
+        for d in (a, b)
+    ]
+    return {'bloques': None, 'hll': np.maximum(*registros)}
+
+
+def _contar_distintos(distintos):
+    if distintos['bloques'] is not None:
+        return sum(len(bloque) for bloque in distintos['bloques'])
+    return int(round(_estimar_hll(distintos['hll'])))
+
+
+# =============================================================================
+# API
+# =============================================================================
+
+def resumir_dataset(df, nombre_dataset=None, capacidad=CAPACIDAD_CUANTILES):
+    """
+    Resume un lote en estructuras combinables.
+
+    El resumen guarda filas, nulos por columna, un sketch de cuantiles por
+    columna numérica y los hashes de las filas (o un HyperLogLog cuando
+    superan LIMITE_HASHES_EXACTOS) para estimar duplicados.
+
+    Returns:
+        dict: resumen del lote (ver combinar_resumenes y perfil_desde_resumen)
+    """
+    columnas_numericas, matriz = matriz_numerica(df)
+    hashes = np.unique(_hashes_filas(df))
+
+    return {
+        'dataset': nombre_dataset,
+        'total_registros': len(df),
+        'nulos_por_columna': df.isnull().sum(),
+        'cuantiles': {
+            columna: _compactar_sketch(_sketch_desde_valores(matriz[:, i]), capacidad)
+            for i, columna in enumerate(columnas_numericas)
+        },
+        'distintos': _distintos_desde_hashes(hashes),
+        'capacidad': capacidad
+    }
+
+
+def combinar_resumenes(a, b):
+    """
+    Combina dos resúmenes del mismo dataset. El costo depende del tamaño de
+    los resúmenes, no de las filas ya procesadas.
+    """
+    if list(a['nulos_por_columna'].index) != list(b['nulos_por_columna'].index):
+        raise ValueError("Los resúmenes deben tener las mismas columnas")
+
+    capacidad = min(a['capacidad'], b['capacidad'])
+    return {
+        'dataset': a['dataset'] if a['dataset'] is not None else b['dataset'],
+        'total_registros': a['total_registros'] + b['total_registros'],
+        'nulos_por_columna': a['nulos_por_columna'] + b['nulos_por_columna'],
+        'cuantiles': {
+            columna: _combinar_sketches(a['cuantiles'][columna], b['cuantiles'][columna], capacidad)
+            for columna in a['cuantiles']
+        },
+        'distintos': _combinar_distintos(a['distintos'], b['distintos']),
+        'capacidad': capacidad
+    }
+
+
+def actualizar_resumen(resumen, df_lote):
+    """Agrega un lote nuevo (ej. las transacciones del día) a un resumen existente."""
+    lote = resumir_dataset(df_lote, resumen['dataset'], resumen['capacidad'])
+    return combinar_resumenes(resumen, lote)
+
+
+def perfil_desde_resumen(resumen):
+    """
+    Perfil de calidad (mismas claves que perfilar_dataset) derivado del resumen.
+    Es exacto mientras los sketches no se hayan compactado y los hashes no
+    hayan pasado a HyperLogLog; después es una estimación.
+    """
+    total_outliers = 0
+    total_valores = 0
+    for sketch in resumen['cuantiles'].values():
+        q1, q3 = _cuartiles_sketch(sketch)
+        iqr = q3 - q1
+        fuera, valores = _contar_fuera_sketch(sketch, q1 - 1.5 * iqr, q3 + 1.5 * iqr)
+        total_outliers += fuera
+        total_valores += valores
+
+    total_registros = resumen['total_registros']
+    registros_duplicados = max(total_registros - _contar_distintos(resumen['distintos']), 0)
+
+    return perfil_desde_conteos(
+        resumen['dataset'],
+        total_registros=total_registros,
+        nulos_por_columna=resumen['nulos_por_columna'],
+        registros_duplicados=registros_duplicados,
+        total_outliers=total_outliers,
+        total_valores=total_valores
+    )
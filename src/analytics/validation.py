@@ -2,14 +2,53 @@
 Funciones de validación y generación de reportes
 """
 
+import copy
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
 import pandas as pd
-from .metrics import calcular_health_score, calcular_metricas_calidad
+from .almacen import CLAVES_JSON
+from .cubo import construir_cubo, distintos_por_dimension
+from .hechos import construir_tabla_hechos
+from .histogramas import calcular_histogramas
+from .metrics import calcular_metricas_calidad, perfilar_dataset, perfilar_dataset_aproximado
+from .planificador import ejecutar_dag
 from ..data_cleaning.cleaner import limpiar_inventario, limpiar_transacciones, limpiar_feedback
+from ..data_cleaning.cache import huella_dataframes
+from ..data_cleaning.indices import construir_indice_claves, contar_semi_join, pertenece
+
+
+# Datasets con más filas que esto se perfilan por muestreo y el perfil exacto
+# se recalcula en segundo plano (ver incorporar_perfiles_exactos)
+UMBRAL_APROXIMADO = 1_000_000
+
+# Tablas de validación que se mantienen en memoria (una por huella de datos limpios)
+MAX_VALIDACIONES = 4
+
+_EJECUTOR_EXACTO = ThreadPoolExecutor(max_workers=1, thread_name_prefix='perfil_exacto')
+
+_VALIDACIONES = OrderedDict()
+_CANDADO_VALIDACIONES = threading.Lock()
+
+# Serializa la incorporación de perfiles exactos y las instantáneas para disco
+_CANDADO_RESULTADOS = threading.RLock()
 
 
-def validar_integridad(df_transacciones, df_inventario, df_transacciones_original):
+def _perfilar(df, ds, umbral_aproximado):
+    """Perfil exacto, o aproximado + recálculo exacto en segundo plano si el dataset es grande."""
+    if umbral_aproximado is None or len(df) <= umbral_aproximado:
+        return perfilar_dataset(df, ds)
+    perfil = perfilar_dataset_aproximado(df, ds)
+    perfil['exacto'] = _EJECUTOR_EXACTO.submit(perfilar_dataset, df, ds)
+    return perfil
+
+
+def validar_integridad(df_transacciones, df_inventario, df_transacciones_original, df_feedback=None):
     """
     Ejecuta las validaciones de integridad post-limpieza.
+    Las relaciones entre tablas se validan con índices de claves (semi-join),
+    sin materializar el merge.
     """
     validaciones = []
     
@@ -25,15 +64,16 @@ def validar_integridad(df_transacciones, df_inventario, df_transacciones_origina
         'estado': '✅ PASS' if abs(ingresos_original - ingresos_post) < 0.01 else '⚠️ REVISAR'
     })
     
-    # Validación 2: Merge con inventario
-    df_merged = df_transacciones.merge(df_inventario, on='SKU_ID', how='left', indicator=True)
-    ventas_con_catalogo = (df_merged['_merge'] == 'both').sum()
-    ventas_sin_catalogo = (df_merged['_merge'] == 'left_only').sum()
+    # Validación 2: Integridad referencial con inventario (semi-join sobre SKU_ID)
+    indice_inventario = construir_indice_claves(df_inventario['SKU_ID'])
+    conteo_catalogo = contar_semi_join(indice_inventario, df_transacciones['SKU_ID'])
+    ventas_con_catalogo = conteo_catalogo['con_match']
+    ventas_sin_catalogo = conteo_catalogo['sin_match']
     
     validaciones.append({
         'test': 'Ventas CON catálogo',
         'esperado': 'Mayoría',
-        'obtenido': f'{ventas_con_catalogo} ({ventas_con_catalogo/len(df_merged)*100:.1f}%)',
+        'obtenido': f'{ventas_con_catalogo} ({ventas_con_catalogo/conteo_catalogo["filas_join"]*100:.1f}%)',
         'diferencia': '-',
         'estado': '✅ PASS' if ventas_con_catalogo > ventas_sin_catalogo else '⚠️ REVISAR'
     })
@@ -46,6 +86,19 @@ def validar_integridad(df_transacciones, df_inventario, df_transacciones_origina
         'estado': '✅ DOCUMENTADO'
     })
     
+    # Validación 2b: Feedback -> Transacciones (semi-join sobre Transaccion_ID)
+    if df_feedback is not None:
+        indice_transacciones = construir_indice_claves(df_transacciones['Transaccion_ID'])
+        feedback_huerfano = (~pertenece(indice_transacciones, df_feedback['Transaccion_ID'])).sum()
+        
+        validaciones.append({
+            'test': 'Feedback con transacción existente',
+            'esperado': '0 huérfanos',
+            'obtenido': f'{feedback_huerfano} de {len(df_feedback)} sin transacción',
+            'diferencia': '-',
+            'estado': '✅ PASS' if feedback_huerfano == 0 else '⚠️ REVISAR'
+        })
+    
     # Validación 3: No hay fechas futuras
     fecha_actual = pd.Timestamp('2026-01-31')
     fechas_futuras = (df_transacciones['Fecha_Venta'] > fecha_actual).sum()
@@ -83,9 +136,49 @@ def validar_integridad(df_transacciones, df_inventario, df_transacciones_origina
     return pd.DataFrame(validaciones)
 
 
-def ejecutar_limpieza_completa(df_inventario, df_transacciones, df_feedback):
+def validar_integridad_cacheada(resultados, df_transacciones_original):
+    """
+    Ejecuta validar_integridad una vez por huella de los DataFrames limpios
+    (resultados['huella']).
+    
+    La tabla se guarda en una caché propia (LRU de MAX_VALIDACIONES), no en
+    resultados, que se comparte entre sesiones como solo lectura; los reruns
+    de Streamlit la reutilizan y solo se recalcula si los datos cambian.
+    """
+    huella = resultados.get('huella') or huella_dataframes(resultados['dataframes'])
+    
+    with _CANDADO_VALIDACIONES:
+        if huella in _VALIDACIONES:
+            _VALIDACIONES.move_to_end(huella)
+            return _VALIDACIONES[huella]
+    
+    df_validaciones = validar_integridad(
+        resultados['dataframes']['transacciones'],
+        resultados['dataframes']['inventario'],
+        df_transacciones_original,
+        resultados['dataframes']['feedback']
+    )
+    
+    with _CANDADO_VALIDACIONES:
+        _VALIDACIONES[huella] = df_validaciones
+        while len(_VALIDACIONES) > MAX_VALIDACIONES:
+            _VALIDACIONES.popitem(last=False)
+    return df_validaciones
+
+
+def ejecutar_limpieza_completa(df_inventario, df_transacciones, df_feedback, max_workers=None,
+                               umbral_aproximado=UMBRAL_APROXIMADO):
     """
     Ejecuta la limpieza completa de los 3 datasets y genera el registro.
+    
+    Las etapas se planifican como un DAG: métricas antes, limpieza y métricas
+    después de cada dataset son independientes entre sí, salvo la limpieza de
+    transacciones, que necesita el inventario limpio. El tiempo de cada etapa
+    queda en resultados['tiempos_etapas'].
+    
+    Los datasets con más de umbral_aproximado filas se perfilan por muestreo:
+    su Health Score trae intervalo de confianza en resultados['intervalos_antes']
+    / ['intervalos_despues'] hasta que llega el perfil exacto.
     """
     # Inicializar registros
     registro_inventario = {
@@ -110,63 +203,141 @@ def ejecutar_limpieza_completa(df_inventario, df_transacciones, df_feedback):
         'justificaciones': []
     }
     
-    # Calcular Health Score ANTES
-    health_antes = {
-        'inventario': calcular_health_score(df_inventario),
-        'transacciones': calcular_health_score(df_transacciones),
-        'feedback': calcular_health_score(df_feedback)
+    originales = {
+        'inventario': df_inventario,
+        'transacciones': df_transacciones,
+        'feedback': df_feedback
     }
     
-    metricas_antes = {
-        'inventario': calcular_metricas_calidad(df_inventario, 'inventario'),
-        'transacciones': calcular_metricas_calidad(df_transacciones, 'transacciones'),
-        'feedback': calcular_metricas_calidad(df_feedback, 'feedback')
+    # Limpieza (cada etapa retorna (df_limpio, registro))
+    etapas = {
+        'limpiar_inventario': {
+            'funcion': lambda: limpiar_inventario(df_inventario, registro_inventario)
+        },
+        'limpiar_transacciones': {
+            'funcion': lambda inventario: limpiar_transacciones(
+                df_transacciones, inventario[0], registro_transacciones
+            ),
+            'dependencias': ['limpiar_inventario']
+        },
+        'limpiar_feedback': {
+            'funcion': lambda: limpiar_feedback(df_feedback, registro_feedback)
+        }
     }
     
-    # Ejecutar limpieza
-    df_inventario_limpio, registro_inventario = limpiar_inventario(df_inventario, registro_inventario)
-    df_transacciones_limpio, registro_transacciones = limpiar_transacciones(
-        df_transacciones, df_inventario_limpio, registro_transacciones
-    )
-    df_feedback_limpio, registro_feedback = limpiar_feedback(df_feedback, registro_feedback)
+    # Perfil de calidad ANTES (sobre originales) y DESPUÉS (sobre limpios):
+    # una sola pasada por dataset de la que salen Health Score y métricas
+    for ds, df in originales.items():
+        etapas[f'perfil_antes_{ds}'] = {
+            'funcion': lambda df=df, ds=ds: _perfilar(df, ds, umbral_aproximado)
+        }
+        etapas[f'perfil_despues_{ds}'] = {
+            'funcion': lambda limpio, ds=ds: _perfilar(limpio[0], ds, umbral_aproximado),
+            'dependencias': [f'limpiar_{ds}']
+        }
     
-    # Calcular Health Score DESPUÉS
-    health_despues = {
-        'inventario': calcular_health_score(df_inventario_limpio),
-        'transacciones': calcular_health_score(df_transacciones_limpio),
-        'feedback': calcular_health_score(df_feedback_limpio)
+    # Tabla de hechos para los dashboards (transacciones ⋈ inventario ⋈ feedback)
+    etapas['tabla_hechos'] = {
+        'funcion': lambda inventario, transacciones, feedback: construir_tabla_hechos(
+            transacciones[0], inventario[0], feedback[0]
+        ),
+        'dependencias': ['limpiar_inventario', 'limpiar_transacciones', 'limpiar_feedback']
     }
     
-    metricas_despues = {
-        'inventario': calcular_metricas_calidad(df_inventario_limpio, 'inventario'),
-        'transacciones': calcular_metricas_calidad(df_transacciones_limpio, 'transacciones'),
-        'feedback': calcular_metricas_calidad(df_feedback_limpio, 'feedback')
+    # Cubo OLAP y distintos no aditivos sobre la tabla de hechos
+    etapas['cubo'] = {
+        'funcion': lambda hechos: construir_cubo(hechos),
+        'dependencias': ['tabla_hechos']
+    }
+    etapas['skus_por_categoria'] = {
+        'funcion': lambda hechos: distintos_por_dimension(hechos, 'Categoria', 'SKU_ID'),
+        'dependencias': ['tabla_hechos']
     }
     
-    # Calcular mejora
-    mejora = {
-        'inventario': health_despues['inventario'] - health_antes['inventario'],
-        'transacciones': health_despues['transacciones'] - health_antes['transacciones'],
-        'feedback': health_despues['feedback'] - health_antes['feedback']
+    # Conteos por bin para los histogramas (ratings, NPS, edad, tiempos de entrega)
+    etapas['histogramas'] = {
+        'funcion': lambda transacciones, feedback: calcular_histogramas({
+            'transacciones': transacciones[0],
+            'feedback': feedback[0]
+        }),
+        'dependencias': ['limpiar_transacciones', 'limpiar_feedback']
     }
     
-    return {
-        'dataframes': {
-            'inventario': df_inventario_limpio,
-            'transacciones': df_transacciones_limpio,
-            'feedback': df_feedback_limpio
-        },
-        'registros': {
-            'inventario': registro_inventario,
-            'transacciones': registro_transacciones,
-            'feedback': registro_feedback
-        },
+    salida, tiempos = ejecutar_dag(etapas, max_workers=max_workers)
+    
+    datasets = list(originales)
+    health_antes = {ds: salida[f'perfil_antes_{ds}']['health_score'] for ds in datasets}
+    health_despues = {ds: salida[f'perfil_despues_{ds}']['health_score'] for ds in datasets}
+    
+    # Calcular mejora
+    mejora = {ds: health_despues[ds] - health_antes[ds] for ds in datasets}
+    
+    resultados = {
+        'dataframes': {ds: salida[f'limpiar_{ds}'][0] for ds in datasets},
+        'registros': {ds: salida[f'limpiar_{ds}'][1] for ds in datasets},
         'health_antes': health_antes,
         'health_despues': health_despues,
         'mejora': mejora,
-        'metricas_antes': metricas_antes,
-        'metricas_despues': metricas_despues
+        'metricas_antes': {
+            ds: calcular_metricas_calidad(None, ds, perfil=salida[f'perfil_antes_{ds}']) for ds in datasets
+        },
+        'metricas_despues': {
+            ds: calcular_metricas_calidad(None, ds, perfil=salida[f'perfil_despues_{ds}']) for ds in datasets
+        },
+        'tiempos_etapas': tiempos,
+        'analitica': {
+            nombre: salida[nombre] for nombre in ['tabla_hechos', 'cubo', 'skus_por_categoria', 'histogramas']
+        },
+        'intervalos_antes': {},
+        'intervalos_despues': {},
+        'perfiles_pendientes': {}
     }
+    resultados['huella'] = huella_dataframes(resultados['dataframes'])
+    
+    for momento in ['antes', 'despues']:
+        for ds in datasets:
+            perfil = salida[f'perfil_{momento}_{ds}']
+            if 'exacto' in perfil:
+                resultados[f'intervalos_{momento}'][ds] = perfil['intervalos']
+                resultados['perfiles_pendientes'][(momento, ds)] = perfil['exacto']
+    
+    return resultados
+
+
+def incorporar_perfiles_exactos(resultados):
+    """
+    Reemplaza en resultados los perfiles aproximados cuyo recálculo exacto
+    ya terminó (Health Score, métricas y mejora).
+    
+    Returns:
+        int: perfiles exactos que siguen pendientes
+    """
+    with _CANDADO_RESULTADOS:
+        pendientes = resultados.get('perfiles_pendientes', {})
+        for (momento, ds), futuro in list(pendientes.items()):
+            if not futuro.done():
+                continue
+            perfil = futuro.result()
+            resultados[f'health_{momento}'][ds] = perfil['health_score']
+            resultados[f'metricas_{momento}'][ds] = calcular_metricas_calidad(None, ds, perfil=perfil)
+            resultados[f'intervalos_{momento}'].pop(ds, None)
+            resultados['mejora'][ds] = resultados['health_despues'][ds] - resultados['health_antes'][ds]
+            pendientes.pop((momento, ds), None)
+        return len(pendientes)
+
+
+def instantanea_resultados(resultados):
+    """
+    Copia de resultados para persistir (guardar_resultados) tomada con el
+    mismo candado que incorporar_perfiles_exactos: registros y métricas se
+    copian; los DataFrames, que no se modifican, se comparten.
+    """
+    with _CANDADO_RESULTADOS:
+        instantanea = {clave: copy.deepcopy(resultados[clave]) for clave in CLAVES_JSON if clave in resultados}
+        instantanea['dataframes'] = dict(resultados['dataframes'])
+        instantanea['analitica'] = dict(resultados.get('analitica', {}))
+        instantanea['perfiles_pendientes'] = dict(resultados.get('perfiles_pendientes', {}))
+    return instantanea
 
 
 def generar_reporte_limpieza(resultados):
@@ -205,3 +376,21 @@ def generar_reporte_limpieza(resultados):
         })
     
     return pd.DataFrame(reporte)
+
+
+def generar_justificaciones(resultados):
+    """
+    Genera un DataFrame con la justificación de cada imputación para descarga.
+    """
+    justificaciones = []
+    for ds in ['inventario', 'transacciones', 'feedback']:
+        for imp in resultados['registros'][ds]['valores_imputados']:
+            justificaciones.append({
+                'Dataset': ds,
+                'Campo': imp['campo'],
+                'Cantidad': imp['cantidad'],
+                'Metodo': imp['metodo'],
+                'Justificacion': imp['justificacion']
+            })
+    
+    return pd.DataFrame(justificaciones)
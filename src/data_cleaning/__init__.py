@@ -4,11 +4,37 @@ Contiene funciones para procesamiento y limpieza de datasets.
 """
 
 from .cleaner import limpiar_inventario, limpiar_transacciones, limpiar_feedback
-from .utils import cargar_datos
+from .motor_reglas import ejecutar_reglas, compilar_reglas
+from .reglas import REGLAS_INVENTARIO, REGLAS_TRANSACCIONES, REGLAS_FEEDBACK
+from .streaming import limpiar_transacciones_streaming
+from .utils import cargar_datos, leer_datasets, RUTAS_DATOS
+from .cache import leer_csv_cacheado, huella_dataframe, huella_dataframes
+from .schema import ESQUEMAS_CRUDOS, ESQUEMAS_LIMPIOS, aplicar_esquema
+from .outliers import limites_iqr, contar_outliers
+from .indices import construir_indice_claves, pertenece, contar_semi_join
 
 __all__ = [
     'limpiar_inventario',
     'limpiar_transacciones', 
     'limpiar_feedback',
-    'cargar_datos'
+    'limpiar_transacciones_streaming',
+    'ejecutar_reglas',
+    'compilar_reglas',
+    'REGLAS_INVENTARIO',
+    'REGLAS_TRANSACCIONES',
+    'REGLAS_FEEDBACK',
+    'cargar_datos',
+    'leer_datasets',
+    'RUTAS_DATOS',
+    'leer_csv_cacheado',
+    'huella_dataframe',
+    'huella_dataframes',
+    'ESQUEMAS_CRUDOS',
+    'ESQUEMAS_LIMPIOS',
+    'aplicar_esquema',
+    'limites_iqr',
+    'contar_outliers',
+    'construir_indice_claves',
+    'pertenece',
+    'contar_semi_join'
 ]
@@ -0,0 +1,157 @@
+"""
+Caché columnar en disco (Parquet) para los datasets fuente
+Evita re-parsear los CSV en cada arranque en frío del servidor.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+
+DIRECTORIO_CACHE = Path('.cache_datos')
+TAMANO_BLOQUE_HASH = 1024 * 1024
+
+
+def calcular_hash_archivo(ruta):
+    """Calcula el SHA-256 del contenido del archivo leyéndolo por bloques."""
+    sha = hashlib.sha256()
+    with open(ruta, 'rb') as archivo:
+        for bloque in iter(lambda: archivo.read(TAMANO_BLOQUE_HASH), b''):
+            sha.update(bloque)
+    return sha.hexdigest()
+
+
+def huella_archivo(ruta, manifiesto=None):
+    """
+    Retorna la huella (ruta, tamaño, mtime, hash) de un archivo.
+
+    Si el manifiesto previo coincide en tamaño y mtime se reutiliza su hash
+    sin volver a leer el archivo; en cualquier otro caso se recalcula.
+    """
+    ruta = Path(ruta)
+    stat = ruta.stat()
+    huella = {
+        'ruta': str(ruta.resolve()),
+        'tamano': stat.st_size,
+        'mtime_ns': stat.st_mtime_ns,
+    }
+
+    if (
+        manifiesto
+        and manifiesto.get('ruta') == huella['ruta']
+        and manifiesto.get('tamano') == huella['tamano']
+        and manifiesto.get('mtime_ns') == huella['mtime_ns']
+    ):
+        huella['sha256'] = manifiesto['sha256']
+    else:
+        huella['sha256'] = calcular_hash_archivo(ruta)
+
+    return huella
+
+
+def huella_dataframe(df):
+    """
+    Huella de contenido de un DataFrame: columnas, dtypes y hash de cada fila
+    (incluyendo el índice). Cambia si cambia cualquier valor.
+    """
+    sha = hashlib.sha256()
+    sha.update(json.dumps([[str(c), str(t)] for c, t in df.dtypes.items()]).encode('utf-8'))
+    sha.update(pd.util.hash_pandas_object(df, index=True).to_numpy().tobytes())
+    return sha.hexdigest()
+
+
+def huella_dataframes(dataframes):
+    """Huella combinada de un dict {nombre: DataFrame}."""
+    sha = hashlib.sha256()
+    for nombre in sorted(dataframes):
+        sha.update(f'{nombre}:{huella_dataframe(dataframes[nombre])};'.encode('utf-8'))
+    return sha.hexdigest()
+
+
+def _clave_lectura(kwargs_lectura):
+    """Hash estable de los parámetros de lectura (dtypes, separador, etc.)."""
+    serializado = json.dumps(kwargs_lectura, sort_keys=True, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()[:12]
+
+
+def _leer_manifiesto(ruta_manifiesto):
+    try:
+        with open(ruta_manifiesto, 'r', encoding='utf-8') as archivo:
+            return json.load(archivo)
+    except (OSError, ValueError):
+        return None
+
+
+def _escribir_atomico(ruta_destino, escribir):
+    """
+    Escribe en un temporal y lo renombra para no dejar archivos a medias.
+    Si la escritura falla, el temporal se elimina y se propaga el error.
+    """
+    ruta_tmp = ruta_destino.with_name(ruta_destino.name + '.tmp')
+    try:
+        escribir(ruta_tmp)
+        os.replace(ruta_tmp, ruta_destino)
+    except BaseException:
+        ruta_tmp.unlink(missing_ok=True)
+        raise
+
+
+def _guardar_manifiesto(ruta_manifiesto, huella, ruta_parquet):
+    contenido = dict(huella, archivo_parquet=ruta_parquet.name)
+    _escribir_atomico(
+        ruta_manifiesto,
+        lambda destino: destino.write_text(json.dumps(contenido, indent=2), encoding='utf-8')
+    )
+
+
+def leer_csv_cacheado(ruta, directorio_cache=DIRECTORIO_CACHE, **kwargs_lectura):
+    """
+    Lee un CSV usando una copia Parquet en disco cuando el archivo no cambió.
+
+    La entrada de caché se identifica por ruta, tamaño, mtime y hash de
+    contenido, más los parámetros de lectura. Si el CSV fue editado se
+    re-parsea y se reemplaza la copia. Si el disco no es escribible o falta
+    el motor Parquet, se degrada a una lectura CSV normal.
+    """
+    ruta = Path(ruta)
+    directorio_cache = Path(directorio_cache)
+    nombre_base = f'{ruta.stem}-{_clave_lectura(kwargs_lectura)}'
+    ruta_manifiesto = directorio_cache / f'{nombre_base}.json'
+
+    manifiesto = _leer_manifiesto(ruta_manifiesto)
+    huella = huella_archivo(ruta, manifiesto)
+    ruta_parquet = directorio_cache / f'{nombre_base}-{huella["sha256"][:16]}.parquet'
+
+    # Caché válida: mismo contenido (aunque haya cambiado el mtime)
+    if manifiesto and manifiesto.get('sha256') == huella['sha256'] and ruta_parquet.exists():
+        try:
+            df = pd.read_parquet(ruta_parquet)
+        except Exception:
+            df = None
+        if df is not None:
+            if manifiesto.get('mtime_ns') != huella['mtime_ns']:
+                try:
+                    _guardar_manifiesto(ruta_manifiesto, huella, ruta_parquet)
+                except OSError:
+                    pass
+            return df
+
+    df = pd.read_csv(ruta, **kwargs_lectura)
+
+    try:
+        directorio_cache.mkdir(parents=True, exist_ok=True)
+        _escribir_atomico(ruta_parquet, lambda destino: df.to_parquet(destino, index=False))
+        _guardar_manifiesto(ruta_manifiesto, huella, ruta_parquet)
+    except (OSError, ImportError, ValueError, TypeError):
+        return df
+
+    # Eliminar versiones anteriores del mismo archivo
+    if manifiesto and manifiesto.get('archivo_parquet') not in (None, ruta_parquet.name):
+        anterior = directorio_cache / manifiesto['archivo_parquet']
+        anterior.unlink(missing_ok=True)
+
+    return df
+
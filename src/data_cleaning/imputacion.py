@@ -0,0 +1,65 @@
+"""
+Primitivas vectorizadas de imputación por grupo
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def imputar_mediana_por_grupo(df, columna, clave, centinela=None):
+    """
+    Reemplaza placeholders de una columna con la mediana de su grupo.
+
+    Placeholders: valores >= centinela, o nulos si centinela es None.
+    La mediana de cada grupo se calcula solo con valores válidos; filas sin
+    grupo o de grupos sin valores válidos reciben la mediana global.
+    Se calcula una sola reducción agrupada y se asigna en un solo paso,
+    sin recorrer filas.
+
+    Args:
+        df (pd.DataFrame): DataFrame con la columna y la clave de agrupación
+        columna (str): Columna a imputar
+        clave (str): Columna de agrupación (ej. Ciudad_Destino)
+        centinela (float, optional): Valor a partir del cual se considera placeholder
+
+    Returns:
+        tuple: (Serie imputada, detalle) donde detalle contiene 'cantidad',
+        'mediana_global' y 'medianas_por_grupo' {grupo: {'cantidad', 'mediana'}}
+        solo para los grupos que efectivamente recibieron imputaciones.
+    """
+    valores = df[columna]
+    if centinela is None:
+        placeholder = valores.isna()
+    else:
+        placeholder = valores >= centinela
+
+    validos = valores.where(~placeholder)
+    mediana_global = validos.median()
+
+    # Una sola reducción agrupada; luego cada fila toma la mediana de su grupo
+    # por posición (índice -1 = sin grupo -> NaN -> mediana global)
+    medianas = validos.groupby(df[clave], observed=True).median()
+    posiciones = medianas.index.get_indexer(df[clave])
+    relleno = np.append(medianas.to_numpy(dtype=float), np.nan)[posiciones]
+    relleno = np.where(np.isnan(relleno), mediana_global, relleno)
+    imputada = valores.mask(placeholder, pd.Series(relleno, index=df.index))
+
+    # Detalle por grupo para el registro de auditoría
+    cantidades = df.loc[placeholder, clave].value_counts(dropna=False, sort=False)
+    cantidades = cantidades[cantidades > 0]
+
+    medianas_por_grupo = {}
+    for grupo, cantidad in cantidades.items():
+        mediana = medianas.get(grupo) if pd.notna(grupo) else None
+        if mediana is None or pd.isna(mediana):
+            mediana = mediana_global
+        etiqueta = str(grupo) if pd.notna(grupo) else 'Sin grupo'
+        medianas_por_grupo[etiqueta] = {'cantidad': int(cantidad), 'mediana': round(float(mediana), 2)}
+
+    detalle = {
+        'cantidad': int(placeholder.sum()),
+        'mediana_global': float(mediana_global) if pd.notna(mediana_global) else None,
+        'medianas_por_grupo': medianas_por_grupo
+    }
+
+    return imputada, detalle
@@ -0,0 +1,68 @@
+"""
+Índices de claves para chequeos de integridad referencial (semi-join)
+Responden "¿esta clave existe en la otra tabla?" con una búsqueda en una
+tabla hash, sin materializar las columnas de la tabla referenciada.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def construir_indice_claves(claves):
+    """
+    Construye un índice reutilizable sobre una columna de claves.
+
+    El pd.Index de claves únicas mantiene su tabla hash en caché, así que las
+    búsquedas sucesivas no la reconstruyen. Los nulos no se indexan (nunca
+    coinciden, como en un join SQL).
+
+    Args:
+        claves (pd.Series): Columna de claves (ej. inventario['SKU_ID'])
+
+    Returns:
+        dict: {'claves': pd.Index único, 'multiplicidad': ndarray de repeticiones}
+    """
+    conteos = pd.Series(claves).value_counts(dropna=True, sort=False)
+    return {
+        'claves': conteos.index,
+        'multiplicidad': conteos.to_numpy()
+    }
+
+
+def posiciones_claves(indice, valores):
+    """
+    Posición de cada valor en el índice (-1 si no existe).
+    En columnas categóricas se busca una vez por categoría y se expande por códigos.
+    """
+    valores = pd.Series(valores)
+    if isinstance(valores.dtype, pd.CategoricalDtype):
+        por_categoria = indice['claves'].get_indexer(valores.cat.categories)
+        codigos = valores.cat.codes.to_numpy()
+        return np.append(por_categoria, -1)[codigos]
+
+    return indice['claves'].get_indexer(valores)
+
+
+def pertenece(indice, valores):
+    """Máscara booleana (alineada con valores) de las claves presentes en el índice."""
+    valores = pd.Series(valores)
+    return pd.Series(posiciones_claves(indice, valores) >= 0, index=valores.index, name=valores.name)
+
+
+def contar_semi_join(indice, valores):
+    """
+    Conteos de un left join contra el índice sin materializarlo.
+
+    Returns:
+        dict: 'con_match' (filas 'both' del join, contando multiplicidad),
+        'sin_match' (filas 'left_only') y 'filas_join' (total del join)
+    """
+    posiciones = posiciones_claves(indice, valores)
+    encontradas = posiciones >= 0
+    con_match = int(indice['multiplicidad'][posiciones[encontradas]].sum())
+    sin_match = int((~encontradas).sum())
+    return {
+        'con_match': con_match,
+        'sin_match': sin_match,
+        'filas_join': con_match + sin_match
+    }
@@ -0,0 +1,336 @@
+"""
+Motor de reglas de limpieza declarativas
+Compila una especificación (lista de dicts) en cadenas vectorizadas por columna
+y genera automáticamente las entradas del registro de auditoría.
+"""
+
+import re
+
+import numpy as np
+import pandas as pd
+
+from .imputacion import imputar_mediana_por_grupo
+from .indices import construir_indice_claves, pertenece
+from .outliers import limites_iqr
+from .schema import reemplazar_valores
+
+
+# =============================================================================
+# UTILIDADES
+# =============================================================================
+
+def _por_categorias(serie, funcion):
+    """
+    Aplica una transformación elemento a elemento.
+    En columnas categóricas se evalúa solo sobre las categorías y se expande
+    por códigos, así el costo depende de los valores únicos y no de las filas.
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return funcion(serie)
+
+    categorias = pd.Series(serie.cat.categories)
+    transformadas = funcion(categorias)
+    codigos = serie.cat.codes.to_numpy()
+    nulo = funcion(pd.Series([np.nan], dtype=object)).iloc[0]
+    valores = pd.concat([transformadas, pd.Series([nulo])], ignore_index=True)
+    return pd.Series(valores.to_numpy()[codigos], index=serie.index, name=serie.name)
+
+
+def _a_nativo(valor):
+    """Convierte escalares numpy a tipos nativos para que el registro sea serializable."""
+    if isinstance(valor, np.generic):
+        return valor.item()
+    return valor
+
+
+def _formatear(plantilla, estadisticas):
+    """
+    Rellena una plantilla del registro con las estadísticas de la regla.
+    Una plantilla que es exactamente '{nombre}' retorna el valor sin formatear
+    (ej. 'cantidad' se conserva numérico).
+    """
+    if not isinstance(plantilla, str):
+        return plantilla
+    coincidencia = re.fullmatch(r'\{(\w+)\}', plantilla)
+    if coincidencia:
+        return estadisticas[coincidencia.group(1)]
+    return plantilla.format(**estadisticas)
+
+
+# =============================================================================
+# REGLAS POR COLUMNA
+# Cada regla recibe la serie actual y retorna (serie, estadisticas, columnas_nuevas)
+# =============================================================================
+
+def _regla_mapeo(serie, regla, df, contexto):
+    unicos_antes = serie.nunique()
+    serie = reemplazar_valores(serie, regla['mapeo'])
+    return serie, {'unicos_antes': unicos_antes, 'unicos_despues': serie.nunique()}, {}
+
+
+def _regla_a_numerico(serie, regla, df, contexto):
+    mapeo = regla.get('mapeo', {})
+
+    def convertir(valores):
+        return pd.to_numeric(valores.astype(str).replace(mapeo), errors='coerce')
+
+    serie = _por_categorias(serie, convertir).astype(float)
+    return serie, {'cantidad': serie.isnull().sum()}, {}
+
+
+def _regla_a_fecha(serie, regla, df, contexto):
+    formato = regla.get('formato')
+
+    def convertir(valores):
+        return pd.to_datetime(valores, format=formato, errors='coerce')
+
+    serie = pd.to_datetime(_por_categorias(serie, convertir))
+    return serie, {'cantidad': serie.isnull().sum()}, {}
+
+
+def _regla_imputar_mediana(serie, regla, df, contexto):
+    mediana = serie.median()
+    cantidad = serie.isnull().sum()
+    return serie.fillna(mediana), {'cantidad': cantidad, 'mediana': mediana}, {}
+
+
+def _regla_valor_absoluto(serie, regla, df, contexto):
+    negativos = serie < 0
+    cantidad = negativos.sum()
+    if cantidad > 0:
+        serie = serie.mask(negativos, -serie)
+    return serie, {'cantidad': cantidad}, {}
+
+
+def _regla_imputar_mediana_grupo(serie, regla, df, contexto):
+    clave = regla['clave']
+    marco = pd.DataFrame({serie.name: serie, clave: df[clave]})
+    serie, detalle = imputar_mediana_por_grupo(marco, serie.name, clave, regla.get('centinela'))
+    return serie, detalle, {}
+
+
+def _regla_flag_iqr(serie, regla, df, contexto):
+    limites = limites_iqr(serie.to_frame()).iloc[0]
+    limite_inferior = limites['limite_inferior']
+    if 'limite_inferior_minimo' in regla:
+        limite_inferior = max(regla['limite_inferior_minimo'], limite_inferior)
+    limite_superior = limites['limite_superior']
+
+    flag = (serie < limite_inferior) | (serie > limite_superior)
+    estadisticas = {
+        'cantidad': flag.sum(),
+        'limite_inferior': limite_inferior,
+        'limite_superior': limite_superior
+    }
+    return serie, estadisticas, {regla['destino']: flag}
+
+
+def _regla_rango(serie, regla, df, contexto):
+    """
+    Regla fusionada de rango: detecta valores fuera de [minimo, maximo] con
+    una sola máscara y los corrige según la acción:
+    - 'mediana': se reemplazan por la mediana de los valores válidos
+    - 'recortar': se ajustan al rango; si hay 'extremo', los valores por
+      encima de él se imputan antes con la mediana del resto
+    """
+    minimo = regla.get('minimo')
+    maximo = regla.get('maximo')
+
+    fuera = pd.Series(False, index=serie.index)
+    if minimo is not None:
+        fuera |= serie < minimo
+    if maximo is not None:
+        fuera |= serie > maximo
+
+    cantidad = fuera.sum()
+    estadisticas = {'cantidad': cantidad, 'mediana': np.nan}
+    if cantidad == 0:
+        return serie, estadisticas, {}
+
+    if regla.get('accion', 'recortar') == 'mediana':
+        estadisticas['mediana'] = serie[~fuera].median()
+        serie = serie.mask(fuera, estadisticas['mediana'])
+    else:
+        if 'extremo' in regla:
+            extremos = serie > regla['extremo']
+            estadisticas['mediana'] = serie[~extremos].median()
+            serie = serie.mask(extremos, estadisticas['mediana'])
+        serie = serie.clip(minimo, maximo)
+
+    return serie, estadisticas, {}
+
+
+def _regla_limitar_fecha(serie, regla, df, contexto):
+    maximo = pd.Timestamp(regla['maximo'])
+    futuras = serie > maximo
+    cantidad = futuras.sum()
+    if cantidad > 0:
+        serie = serie.mask(futuras, maximo)
+    return serie, {'cantidad': cantidad, 'maximo': str(maximo.date())}, {}
+
+
+def _regla_booleano(serie, regla, df, contexto):
+    verdaderos = regla['verdaderos']
+    serie = _por_categorias(serie, lambda valores: valores.isin(verdaderos)).astype(bool)
+    return serie, {}, {}
+
+
+def _regla_validar(serie, regla, df, contexto):
+    return serie, {'minimo': serie.min(), 'maximo': serie.max()}, {}
+
+
+def _regla_pertenencia(serie, regla, df, contexto):
+    """
+    Flag de integridad referencial contra las claves del contexto.
+    El contexto puede traer un índice de construir_indice_claves (reutilizable)
+    o la columna de claves, en cuyo caso se indexa aquí.
+    """
+    referencia = contexto[regla['referencia']]
+    if not isinstance(referencia, dict):
+        referencia = construir_indice_claves(referencia)
+    flag = pertenece(referencia, serie)
+    if regla.get('negado', False):
+        flag = ~flag
+
+    estadisticas = {
+        'cantidad': flag.sum(),
+        'claves': serie[flag].nunique(),
+        'monto': df.loc[flag, regla['columna_monto']].sum() if 'columna_monto' in regla else 0.0
+    }
+    return serie, estadisticas, {regla['destino']: flag}
+
+
+REGLAS_COLUMNA = {
+    'mapeo': _regla_mapeo,
+    'a_numerico': _regla_a_numerico,
+    'a_fecha': _regla_a_fecha,
+    'imputar_mediana': _regla_imputar_mediana,
+    'valor_absoluto': _regla_valor_absoluto,
+    'imputar_mediana_grupo': _regla_imputar_mediana_grupo,
+    'flag_iqr': _regla_flag_iqr,
+    'rango': _regla_rango,
+    'limitar_fecha': _regla_limitar_fecha,
+    'booleano': _regla_booleano,
+    'validar': _regla_validar,
+    'pertenencia': _regla_pertenencia
+}
+
+
+# =============================================================================
+# REGLAS A NIVEL DE DATASET
+# Cada regla recibe el DataFrame completo y retorna (df, estadisticas)
+# =============================================================================
+
+def _regla_eliminar_duplicados(df, regla, contexto):
+    duplicados = df.duplicated(keep='first')
+    cantidad = duplicados.sum()
+    if cantidad > 0:
+        df = df[~duplicados]
+    return df, {'cantidad': cantidad}
+
+
+REGLAS_DATASET = {
+    'eliminar_duplicados': _regla_eliminar_duplicados
+}
+
+
+# =============================================================================
+# COMPILACIÓN Y EJECUCIÓN
+# =============================================================================
+
+def compilar_reglas(especificacion):
+    """
+    Compila la especificación en etapas ejecutables.
+
+    Las reglas de dataset (ej. eliminar duplicados) actúan como barreras.
+    Se respeta el orden de declaración: solo las reglas consecutivas sobre
+    la misma columna se fusionan en una cadena (la columna se extrae una vez,
+    recorre sus reglas y se escribe una sola vez). Una regla que lee otra
+    columna (ej. la clave de imputar_mediana_grupo) ve siempre el estado
+    declarado antes que ella.
+
+    Returns:
+        list: etapas ('columnas', [(columna, [reglas])]) o ('dataset', regla)
+    """
+    etapas = []
+    cadenas = []
+
+    for regla in especificacion:
+        tipo = regla['regla']
+        if tipo in REGLAS_DATASET:
+            if cadenas:
+                etapas.append(('columnas', cadenas))
+                cadenas = []
+            etapas.append(('dataset', regla))
+        elif tipo in REGLAS_COLUMNA:
+            if cadenas and cadenas[-1][0] == regla['columna']:
+                cadenas[-1][1].append(regla)
+            else:
+                cadenas.append((regla['columna'], [regla]))
+        else:
+            raise ValueError(f"Regla desconocida: {tipo}")
+
+    if cadenas:
+        etapas.append(('columnas', cadenas))
+
+    return etapas
+
+
+def registrar_regla(registro, regla, estadisticas):
+    """Agrega al registro la entrada declarada por la regla."""
+    plantilla = regla.get('registro')
+    if plantilla is None:
+        return
+    if plantilla.get('condicion', 'si_hay_cambios') == 'si_hay_cambios' and not estadisticas.get('cantidad', 0):
+        return
+
+    estadisticas = {clave: _a_nativo(valor) for clave, valor in estadisticas.items()}
+    estadisticas.setdefault('campo', regla.get('columna'))
+
+    entrada = {
+        clave: _formatear(valor, estadisticas)
+        for clave, valor in plantilla['entrada'].items()
+    }
+    registro[plantilla['seccion']].append(entrada)
+
+    for clave, valor in plantilla.get('campos_extra', {}).items():
+        registro[clave] = _formatear(valor, estadisticas)
+
+
+def ejecutar_reglas(df, especificacion, registro, contexto=None):
+    """
+    Ejecuta una especificación de reglas sobre el DataFrame.
+
+    Args:
+        df (pd.DataFrame): Dataset original (no se modifica)
+        especificacion (list): Reglas declarativas (ver src/data_cleaning/reglas.py)
+        registro (dict): Registro de auditoría a completar
+        contexto (dict, optional): Datos externos que usan algunas reglas
+            (ej. 'skus_inventario' para la regla de pertenencia)
+
+    Returns:
+        tuple: (DataFrame limpio, registro)
+    """
+    contexto = contexto or {}
+    # Copia superficial: con copy-on-write solo se materializan las columnas que cambian
+    df_limpio = df.copy(deep=False)
+
+    for tipo_etapa, contenido in compilar_reglas(especificacion):
+        if tipo_etapa == 'dataset':
+            df_limpio, estadisticas = REGLAS_DATASET[contenido['regla']](df_limpio, contenido, contexto)
+            registrar_regla(registro, contenido, estadisticas)
+            continue
+
+        for columna, cadena in contenido:
+            original = serie = df_limpio[columna]
+            for regla in cadena:
+                serie, estadisticas, columnas_nuevas = REGLAS_COLUMNA[regla['regla']](
+                    serie, regla, df_limpio, contexto
+                )
+                for nombre, valores in columnas_nuevas.items():
+                    df_limpio[nombre] = valores
+                registrar_regla(registro, regla, estadisticas)
+            if serie is not original:
+                df_limpio[columna] = serie
+
+    return df_limpio, registro
@@ -0,0 +1,79 @@
+"""
+Límites IQR calculados en bloque para todas las columnas numéricas
+"""
+
+import warnings
+
+import numpy as np
+import pandas as pd
+
+
+def matriz_numerica(df, columnas=None):
+    """
+    Retorna (columnas, matriz 2-D float64) con NaN en los valores faltantes.
+    Por defecto usa todas las columnas numéricas del DataFrame.
+    """
+    if columnas is None:
+        columnas = df.select_dtypes(include=[np.number]).columns
+    columnas = list(columnas)
+    if not columnas:
+        return columnas, np.empty((len(df), 0))
+    return columnas, df[columnas].to_numpy(dtype='float64', na_value=np.nan)
+
+
+def _limites_desde_matriz(columnas, matriz, factor):
+    if matriz.shape[0] == 0:
+        q1 = q3 = np.full(len(columnas), np.nan)
+    else:
+        with warnings.catch_warnings():
+            # Columnas sin datos: nanquantile retorna NaN y avisa
+            warnings.simplefilter('ignore', RuntimeWarning)
+            q1, q3 = np.nanquantile(matriz, [0.25, 0.75], axis=0)
+    iqr = q3 - q1
+
+    return pd.DataFrame({
+        'Q1': q1,
+        'Q3': q3,
+        'IQR': iqr,
+        'limite_inferior': q1 - factor * iqr,
+        'limite_superior': q3 + factor * iqr
+    }, index=pd.Index(columnas, name='columna'))
+
+
+def limites_iqr(df, columnas=None, factor=1.5):
+    """
+    Cuartiles y límites IQR de varias columnas con una sola llamada a
+    np.nanquantile sobre la matriz numérica.
+
+    Args:
+        df (pd.DataFrame): Dataset
+        columnas (list, optional): Columnas a evaluar (default: numéricas)
+        factor (float): Multiplicador del IQR (1.5 = outlier clásico)
+
+    Returns:
+        pd.DataFrame: indexado por columna con Q1, Q3, IQR, limite_inferior y
+        limite_superior (NaN si la columna no tiene datos)
+    """
+    columnas, matriz = matriz_numerica(df, columnas)
+    return _limites_desde_matriz(columnas, matriz, factor)
+
+
+def contar_outliers(df, columnas=None, factor=1.5):
+    """
+    Cuenta outliers IQR por columna comparando la matriz completa contra los
+    límites por broadcasting.
+
+    Returns:
+        pd.DataFrame: límites de limites_iqr más 'valores' (no nulos) y 'outliers'
+    """
+    columnas, matriz = matriz_numerica(df, columnas)
+    limites = _limites_desde_matriz(columnas, matriz, factor)
+
+    # NaN compara como False en ambos lados, así que no cuenta como outlier
+    fuera = (
+        (matriz < limites['limite_inferior'].to_numpy())
+        | (matriz > limites['limite_superior'].to_numpy())
+    )
+    limites['valores'] = (~np.isnan(matriz)).sum(axis=0)
+    limites['outliers'] = fuera.sum(axis=0)
+    return limites
@@ -0,0 +1,411 @@
+"""
+Especificación declarativa de las reglas de limpieza por dataset
+Cada regla indica la columna, el tipo de regla (ver motor_reglas.py), sus
+parámetros y la plantilla de la entrada que deja en el registro de auditoría.
+Estrategia: CONSERVAR DATOS AL MÁXIMO, imputar con mediana.
+"""
+
+FECHA_REFERENCIA = '2026-01-31'
+
+# Variantes de nombres de ciudad (compartido con la limpieza por chunks)
+MAPEO_CIUDADES = {
+    'MED': 'Medellín',
+    'med': 'Medellín',
+    'Medellin': 'Medellín',
+    'MEDELLIN': 'Medellín',
+    'BOG': 'Bogotá',
+    'bog': 'Bogotá',
+    'Bogota': 'Bogotá',
+    'BOGOTA': 'Bogotá',
+    'Ventas_Web': 'Ventas_Web'  # Mantener como canal especial
+}
+
+
+# =============================================================================
+# INVENTARIO
+# =============================================================================
+
+REGLAS_INVENTARIO = [
+    # 1. Normalizar categorías
+    {
+        'columna': 'Categoria',
+        'regla': 'mapeo',
+        'mapeo': {
+            'smart-phone': 'Smartphones',
+            'LAPTOP': 'Laptops',
+            '???': 'Sin_Categoria'
+        },
+        'registro': {
+            'seccion': 'transformaciones',
+            'condicion': 'siempre',
+            'entrada': {
+                'campo': 'Categoria',
+                'tipo': 'Normalización',
+                'antes': '{unicos_antes} categorías únicas',
+                'despues': '{unicos_despues} categorías únicas',
+                'justificacion': 'Se unificaron variantes (smart-phone → Smartphones, LAPTOP → Laptops) y se etiquetaron valores desconocidos (??? → Sin_Categoria) para mantener trazabilidad.'
+            }
+        }
+    },
+    # 2. Normalizar bodegas
+    {
+        'columna': 'Bodega_Origen',
+        'regla': 'mapeo',
+        'mapeo': {
+            'norte': 'Norte',
+            'ZONA_FRANCA': 'Zona_Franca',
+            'BOD-EXT-99': 'Bodega_Externa'
+        },
+        'registro': {
+            'seccion': 'transformaciones',
+            'condicion': 'siempre',
+            'entrada': {
+                'campo': 'Bodega_Origen',
+                'tipo': 'Normalización',
+                'antes': 'Valores inconsistentes (norte, ZONA_FRANCA, BOD-EXT-99)',
+                'despues': 'Valores estandarizados (Norte, Zona_Franca, Bodega_Externa)',
+                'justificacion': 'Estandarización para permitir agrupaciones correctas en análisis por bodega.'
+            }
+        }
+    },
+    # 3. Lead_Time_Dias a numérico e imputar nulos con mediana
+    {
+        'columna': 'Lead_Time_Dias',
+        'regla': 'a_numerico',
+        'mapeo': {
+            '25-30 días': 27.5,  # Promedio del rango
+            'Inmediato': 1
+        }
+    },
+    {
+        'columna': 'Lead_Time_Dias',
+        'regla': 'imputar_mediana',
+        'registro': {
+            'seccion': 'valores_imputados',
+            'condicion': 'siempre',
+            'entrada': {
+                'campo': 'Lead_Time_Dias',
+                'cantidad': '{cantidad}',
+                'metodo': 'Mediana',
+                'valor_imputado': '{mediana:.1f}',
+                'justificacion': 'Lead Time tiene distribución asimétrica (valores como "25-30 días", "Inmediato"). Se usa mediana ({mediana:.1f} días) para no sesgar por outliers.'
+            }
+        }
+    },
+    # 4. Stock_Actual negativo (cambio de signo) y nulos (mediana por categoría)
+    {
+        'columna': 'Stock_Actual',
+        'regla': 'valor_absoluto',
+        'registro': {
+            'seccion': 'valores_imputados',
+            'entrada': {
+                'campo': 'Stock_Actual',
+                'cantidad': '{cantidad}',
+                'metodo': 'Cambio de signo',
+                'valor_imputado': 'Valor absoluto',
+                'justificacion': 'Stock negativo es físicamente imposible. Se cambió el signo de {cantidad} registros asumiendo error de digitación (el valor absoluto es coherente con el promedio de la categoría).'
+            }
+        }
+    },
+    {
+        'columna': 'Stock_Actual',
+        'regla': 'imputar_mediana_grupo',
+        'clave': 'Categoria',
+        'registro': {
+            'seccion': 'valores_imputados',
+            'entrada': {
+                'campo': 'Stock_Actual',
+                'cantidad': '{cantidad}',
+                'metodo': 'Mediana por categoría',
+                'valor_imputado': 'Variable por categoría (global: {mediana_global:.1f})',
+                'justificacion': 'Se imputan stocks nulos con la mediana de su categoría para mantener coherencia con el comportamiento del grupo de productos similar.',
+                'medianas_por_grupo': '{medianas_por_grupo}'
+            }
+        }
+    },
+    # 5. Costos atípicos: flag IQR (se conservan) y costos < $1 con mediana
+    {
+        'columna': 'Costo_Unitario_USD',
+        'regla': 'flag_iqr',
+        'destino': 'Costo_Atipico',
+        'limite_inferior_minimo': 0.01,  # No puede ser negativo
+        'registro': {
+            'seccion': 'transformaciones',
+            'condicion': 'siempre',
+            'entrada': {
+                'campo': 'Costo_Unitario_USD',
+                'tipo': 'Flag de outliers',
+                'antes': '{cantidad} outliers detectados',
+                'despues': 'Columna Costo_Atipico añadida (True/False)',
+                'justificacion': 'Se conservan los {cantidad} registros con costos atípicos pero se marcan con flag para análisis posterior. Límites IQR: ${limite_inferior:.2f} - ${limite_superior:.2f}'
+            }
+        }
+    },
+    {
+        'columna': 'Costo_Unitario_USD',
+        'regla': 'rango',
+        'minimo': 1,
+        'accion': 'mediana',
+        'registro': {
+            'seccion': 'valores_imputados',
+            'entrada': {
+                'campo': 'Costo_Unitario_USD',
+                'cantidad': '{cantidad}',
+                'metodo': 'Imputación con mediana',
+                'valor_imputado': '{mediana:.2f}',
+                'justificacion': 'Costos < $1 USD son claramente errores de captura. Se imputan con mediana (${mediana:.2f}) para mantener el registro pero con valor realista.'
+            }
+        }
+    },
+    # 6. Ultima_Revision: fechas futuras se imputan con la fecha actual
+    {
+        'columna': 'Ultima_Revision',
+        'regla': 'a_fecha'
+    },
+    {
+        'columna': 'Ultima_Revision',
+        'regla': 'limitar_fecha',
+        'maximo': FECHA_REFERENCIA,
+        'registro': {
+            'seccion': 'valores_imputados',
+            'entrada': {
+                'campo': 'Ultima_Revision',
+                'cantidad': '{cantidad}',
+                'metodo': 'Imputación con fecha actual',
+                'valor_imputado': '{maximo}',
+                'justificacion': '{cantidad} registros tenían fechas futuras (error de sistema). Se imputan con fecha actual para conservar los registros.'
+            }
+        }
+    }
+]
+
+
+# =============================================================================
+# TRANSACCIONES
+# =============================================================================
+
+REGLAS_TRANSACCIONES = [
+    # 1. Convertir Fecha_Venta
+    {
+        'columna': 'Fecha_Venta',
+        'regla': 'a_fecha',
+        'formato': '%d/%m/%Y',
+        'registro': {
+            'seccion': 'transformaciones',
+            'entrada': {
+                'campo': 'Fecha_Venta',
+                'tipo': 'Conversión de formato',
+                'antes': '{cantidad} fechas no parseables',
+                'despues': 'Formato datetime estandarizado',
+                'justificacion': 'Conversión necesaria para análisis temporal.'
+            }
+        }
+    },
+    # 2. Normalizar ciudades
+    {
+        'columna': 'Ciudad_Destino',
+        'regla': 'mapeo',
+        'mapeo': MAPEO_CIUDADES,
+        'registro': {
+            'seccion': 'transformaciones',
+            'condicion': 'siempre',
+            'entrada': {
+                'campo': 'Ciudad_Destino',
+                'tipo': 'Normalización',
+                'antes': '{unicos_antes} ciudades únicas',
+                'despues': '{unicos_despues} ciudades únicas',
+                'justificacion': 'Unificación de variantes de nombres (MED→Medellín, BOG→Bogotá) para análisis geográfico correcto.'
+            }
+        }
+    },
+    # 3. Cantidad_Vendida negativa
+    {
+        'columna': 'Cantidad_Vendida',
+        'regla': 'valor_absoluto',
+        'registro': {
+            'seccion': 'valores_imputados',
+            'entrada': {
+                'campo': 'Cantidad_Vendida',
+                'cantidad': '{cantidad}',
+                'metodo': 'Cambio de signo',
+                'valor_imputado': 'Valor absoluto',
+                'justificacion': '{cantidad} registros con cantidad negativa. El valor absoluto es coherente con los promedios de venta, sugiriendo error de digitación. Se conserva el registro cambiando el signo.'
+            }
+        }
+    },
+    # 4. Tiempo_Entrega_Real placeholder (999 días) con mediana por ciudad
+    {
+        'columna': 'Tiempo_Entrega_Real',
+        'regla': 'imputar_mediana_grupo',
+        'clave': 'Ciudad_Destino',
+        'centinela': 999,
+        'registro': {
+            'seccion': 'valores_imputados',
+            'entrada': {
+                'campo': 'Tiempo_Entrega_Real',
+                'cantidad': '{cantidad}',
+                'metodo': 'Mediana por ciudad',
+                'valor_imputado': 'Variable por ciudad (global: {mediana_global:.1f} días)',
+                'justificacion': '{cantidad} registros con 999 días (placeholder evidente). Se imputan con mediana de su ciudad para reflejar tiempos logísticos reales.',
+                'medianas_por_grupo': '{medianas_por_grupo}'
+            }
+        }
+    },
+    # 5. SKUs huérfanos (integridad referencial contra el inventario)
+    {
+        'columna': 'SKU_ID',
+        'regla': 'pertenencia',
+        'referencia': 'skus_inventario',
+        'negado': True,
+        'destino': 'Sin_Catalogo',
+        'columna_monto': 'Precio_Venta_Final',
+        'registro': {
+            'seccion': 'transformaciones',
+            'entrada': {
+                'campo': 'SKU_ID (Integridad Referencial)',
+                'tipo': 'Flag de SKUs huérfanos',
+                'antes': '{claves} SKUs sin inventario ({cantidad} transacciones)',
+                'despues': 'Columna Sin_Catalogo añadida (True/False)',
+                'justificacion': 'Se conservan {cantidad} transacciones de SKUs no encontrados en inventario (${monto:,.2f} en ingresos). Representan ventas reales que requieren auditoría de catálogo.'
+            },
+            'campos_extra': {
+                'skus_huerfanos_decision': 'DECISIÓN ESTRATÉGICA: Los {cantidad} registros con SKUs huérfanos fueron CONSERVADOS con un flag "Sin_Catalogo". Representan ${monto:,.2f} en ingresos que no pueden descartarse sin auditoría.'
+            }
+        }
+    }
+]
+
+
+# =============================================================================
+# FEEDBACK
+# =============================================================================
+
+REGLAS_FEEDBACK = [
+    # 1. Rating_Producto fuera de rango: extremos (>10) con mediana, resto recortado
+    {
+        'columna': 'Rating_Producto',
+        'regla': 'rango',
+        'minimo': 1,
+        'maximo': 5,
+        'extremo': 10,
+        'accion': 'recortar',
+        'registro': {
+            'seccion': 'valores_imputados',
+            'entrada': {
+                'campo': 'Rating_Producto',
+                'cantidad': '{cantidad}',
+                'metodo': 'Clipping + Mediana',
+                'valor_imputado': '{mediana:.1f}',
+                'justificacion': '{cantidad} ratings fuera de rango 1-5. Valores extremos (>10) se imputan con mediana. Resto se ajusta al rango válido.'
+            }
+        }
+    },
+    # 2. Rating_Logistica fuera de rango
+    {
+        'columna': 'Rating_Logistica',
+        'regla': 'rango',
+        'minimo': 1,
+        'maximo': 5,
+        'accion': 'recortar',
+        'registro': {
+            'seccion': 'transformaciones',
+            'entrada': {
+                'campo': 'Rating_Logistica',
+                'tipo': 'Normalización de escala',
+                'antes': '{cantidad} valores fuera de rango',
+                'despues': 'Valores ajustados al rango 1-5',
+                'justificacion': 'Escala de rating debe estar entre 1-5. Se ajustan valores extremos.'
+            }
+        }
+    },
+    # 3. Edad_Cliente imposible (ej. 195 años) con mediana
+    {
+        'columna': 'Edad_Cliente',
+        'regla': 'rango',
+        'minimo': 18,
+        'maximo': 100,
+        'accion': 'mediana',
+        'registro': {
+            'seccion': 'valores_imputados',
+            'entrada': {
+                'campo': 'Edad_Cliente',
+                'cantidad': '{cantidad}',
+                'metodo': 'Mediana',
+                'valor_imputado': '{mediana:.0f} años',
+                'justificacion': '{cantidad} edades fuera de rango realista (18-100). Se imputan con mediana ({mediana:.0f} años) para mantener el registro de feedback.'
+            }
+        }
+    },
+    # 4. Normalizar Recomienda_Marca
+    {
+        'columna': 'Recomienda_Marca',
+        'regla': 'mapeo',
+        'mapeo': {
+            'SI': 'Sí',
+            'Si': 'Sí',
+            'si': 'Sí',
+            'NO': 'No',
+            'no': 'No',
+            'Maybe': 'Tal vez',
+            'maybe': 'Tal vez',
+            'N/A': 'No responde'
+        },
+        'registro': {
+            'seccion': 'transformaciones',
+            'condicion': 'siempre',
+            'entrada': {
+                'campo': 'Recomienda_Marca',
+                'tipo': 'Normalización',
+                'antes': 'Valores inconsistentes (SI, Maybe, N/A)',
+                'despues': 'Valores estandarizados (Sí, No, Tal vez, No responde)',
+                'justificacion': 'Estandarización para análisis de satisfacción y recomendación.'
+            }
+        }
+    },
+    # 5. Ticket_Soporte_Abierto a booleano
+    {
+        'columna': 'Ticket_Soporte_Abierto',
+        'regla': 'booleano',
+        'verdaderos': [True, 'Sí', 'Si', 'SI', '1', 1],
+        'registro': {
+            'seccion': 'transformaciones',
+            'condicion': 'siempre',
+            'entrada': {
+                'campo': 'Ticket_Soporte_Abierto',
+                'tipo': 'Conversión a booleano',
+                'antes': 'Valores mixtos (Sí/No/1/0)',
+                'despues': 'Booleano (True/False)',
+                'justificacion': 'Estandarización para análisis de tickets de soporte.'
+            }
+        }
+    },
+    # 6. Duplicados exactos (conservando el primero)
+    {
+        'regla': 'eliminar_duplicados',
+        'registro': {
+            'seccion': 'registros_eliminados',
+            'entrada': {
+                'motivo': 'Duplicados exactos',
+                'cantidad': '{cantidad}',
+                'accion': 'Eliminados (conservando el primero)',
+                'justificacion': '{cantidad} registros duplicados exactos. Se conserva el primer registro de cada grupo de duplicados.'
+            }
+        }
+    },
+    # 7. Satisfaccion_NPS ya está en escala -100 a 100 (solo validación)
+    {
+        'columna': 'Satisfaccion_NPS',
+        'regla': 'validar',
+        'registro': {
+            'seccion': 'transformaciones',
+            'condicion': 'siempre',
+            'entrada': {
+                'campo': 'Satisfaccion_NPS',
+                'tipo': 'Validación',
+                'antes': 'Rango: {minimo:.1f} a {maximo:.1f}',
+                'despues': 'Escala -100 a 100 validada',
+                'justificacion': 'NPS ya está en escala estándar (-100 a 100). No requiere transformación.'
+            }
+        }
+    }
+]
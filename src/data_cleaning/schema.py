@@ -0,0 +1,123 @@
+"""
+Registro de esquemas (dtypes por columna) de los datasets
+Se aplica al cargar los CSV y de nuevo al terminar cada función limpiar_*.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+# Texto de alta cardinalidad (IDs, comentarios) en strings respaldados por Arrow.
+# Texto de baja cardinalidad como categórico.
+# Montos en USD se mantienen en float64 para que las sumas de ingresos
+# cuadren al centavo en validar_integridad; el resto de numéricos en 32 bits.
+TEXTO = 'string[pyarrow]'
+
+ESQUEMAS_CRUDOS = {
+    'inventario': {
+        'SKU_ID': TEXTO,
+        'Categoria': 'category',
+        'Stock_Actual': 'float32',
+        'Costo_Unitario_USD': 'float64',
+        'Punto_Reorden': 'int32',
+        'Lead_Time_Dias': 'category',
+        'Bodega_Origen': 'category',
+        'Ultima_Revision': 'category'
+    },
+    'transacciones': {
+        'Transaccion_ID': TEXTO,
+        'SKU_ID': TEXTO,
+        'Fecha_Venta': 'category',
+        'Cantidad_Vendida': 'int32',
+        'Precio_Venta_Final': 'float64',
+        'Costo_Envio': 'float64',
+        'Tiempo_Entrega_Real': 'float32',
+        'Estado_Envio': 'category',
+        'Ciudad_Destino': 'category',
+        'Canal_Venta': 'category'
+    },
+    'feedback': {
+        'Feedback_ID': TEXTO,
+        'Transaccion_ID': TEXTO,
+        'Rating_Producto': 'float32',
+        'Rating_Logistica': 'float32',
+        'Comentario_Texto': 'category',
+        'Recomienda_Marca': 'category',
+        'Ticket_Soporte_Abierto': 'category',
+        'Edad_Cliente': 'float32',
+        'Satisfaccion_NPS': 'float32'
+    }
+}
+
+ESQUEMAS_LIMPIOS = {
+    'inventario': {
+        **ESQUEMAS_CRUDOS['inventario'],
+        'Lead_Time_Dias': 'float32',
+        'Ultima_Revision': 'datetime64[ns]',
+        'Costo_Atipico': 'bool'
+    },
+    'transacciones': {
+        **ESQUEMAS_CRUDOS['transacciones'],
+        'Fecha_Venta': 'datetime64[ns]',
+        'Sin_Catalogo': 'bool'
+    },
+    'feedback': {
+        **ESQUEMAS_CRUDOS['feedback'],
+        'Ticket_Soporte_Abierto': 'bool'
+    }
+}
+
+
+def aplicar_esquema(df, esquema):
+    """
+    Convierte las columnas del DataFrame a los dtypes del esquema.
+    Las columnas ausentes en el DataFrame se ignoran.
+
+    Raises:
+        ValueError: si una columna con nulos debe pasar a un entero sin
+            soporte de nulos (ej. 'int32'); la limpieza debe imputarlos o
+            descartarlos antes
+    """
+    conversiones = {
+        col: dtype for col, dtype in esquema.items()
+        if col in df.columns and df[col].dtype != pd.api.types.pandas_dtype(dtype)
+    }
+    if not conversiones:
+        return df
+
+    for col, dtype in conversiones.items():
+        destino = pd.api.types.pandas_dtype(dtype)
+        if isinstance(destino, np.dtype) and destino.kind in 'iu':
+            nulos = int(df[col].isna().sum())
+            if nulos:
+                raise ValueError(
+                    f"La columna '{col}' tiene {nulos} nulos y el esquema la declara '{dtype}' "
+                    "(entero sin nulos): impútelos o elimínelos antes de aplicar el esquema"
+                )
+    return df.astype(conversiones)
+
+
+def reemplazar_valores(serie, mapeo):
+    """
+    Equivalente a Series.replace(mapeo) que respeta columnas categóricas.
+
+    En categóricas el mapeo se aplica sobre las categorías (no sobre cada
+    fila) y los códigos se reasignan, fusionando categorías que terminan
+    con la misma etiqueta.
+    """
+    if not isinstance(serie.dtype, pd.CategoricalDtype):
+        return serie.replace(mapeo)
+
+    etiquetas = [mapeo.get(cat, cat) for cat in serie.cat.categories]
+    validas = [etiqueta for etiqueta in etiquetas if not pd.isna(etiqueta)]
+    nuevas_categorias = pd.Index(pd.unique(pd.Series(validas, dtype=object)))
+
+    indexador = nuevas_categorias.get_indexer(pd.Index(etiquetas, dtype=object))
+    codigos = serie.cat.codes.to_numpy()
+    nuevos_codigos = np.where(codigos >= 0, indexador[codigos], -1)
+
+    return pd.Series(
+        pd.Categorical.from_codes(nuevos_codigos, categories=nuevas_categorias),
+        index=serie.index,
+        name=serie.name
+    )
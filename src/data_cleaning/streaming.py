@@ -0,0 +1,189 @@
+"""
+Limpieza de transacciones por chunks para archivos que no caben en memoria
+Aplica las mismas reglas de limpiar_transacciones leyendo el CSV por partes.
+"""
+
+from pathlib import Path
+
+import pandas as pd
+
+from .indices import construir_indice_claves, pertenece
+from .motor_reglas import registrar_regla
+from .reglas import MAPEO_CIUDADES, REGLAS_TRANSACCIONES
+from .schema import ESQUEMAS_CRUDOS, ESQUEMAS_LIMPIOS, aplicar_esquema, reemplazar_valores
+
+
+TAMANO_CHUNK = 200_000
+
+
+def _leer_chunks(ruta_csv, tamano_chunk):
+    return pd.read_csv(ruta_csv, dtype=ESQUEMAS_CRUDOS['transacciones'], chunksize=tamano_chunk)
+
+
+def _sumar_conteos(acumulado, conteos):
+    if acumulado is None:
+        return conteos
+    return acumulado.add(conteos, fill_value=0)
+
+
+def _mediana_desde_conteos(conteos):
+    """
+    Mediana exacta a partir de un histograma {valor: frecuencia}.
+    Tiempo_Entrega_Real son días enteros, así que el histograma es pequeño.
+    """
+    conteos = conteos[conteos > 0].sort_index()
+    total = conteos.sum()
+    if total == 0:
+        return float('nan')
+
+    acumulado = conteos.cumsum().to_numpy()
+    valores = conteos.index.to_numpy(dtype=float)
+    # Posiciones (0-indexadas) de los elementos centrales
+    bajo = valores[(acumulado > (total - 1) // 2).argmax()]
+    alto = valores[(acumulado > total // 2).argmax()]
+    return (bajo + alto) / 2
+
+
+def calcular_estadisticas_transacciones(ruta_csv, tamano_chunk=TAMANO_CHUNK):
+    """
+    Primera pasada: estadísticas globales que las reglas por chunk necesitan.
+
+    Retorna las medianas de Tiempo_Entrega_Real por ciudad normalizada
+    (excluyendo el placeholder 999), la mediana global y las ciudades
+    únicas antes y después de normalizar.
+    """
+    conteos_tiempo = None
+    ciudades_crudas = set()
+
+    for chunk in _leer_chunks(ruta_csv, tamano_chunk):
+        ciudades_crudas.update(chunk['Ciudad_Destino'].dropna().unique())
+        ciudad = reemplazar_valores(chunk['Ciudad_Destino'], MAPEO_CIUDADES)
+
+        validos = chunk['Tiempo_Entrega_Real'] < 999
+        conteos = (
+            pd.DataFrame({'Ciudad_Destino': ciudad[validos], 'Tiempo_Entrega_Real': chunk.loc[validos, 'Tiempo_Entrega_Real']})
+            .groupby(['Ciudad_Destino', 'Tiempo_Entrega_Real'], observed=True)
+            .size()
+        )
+        conteos_tiempo = _sumar_conteos(conteos_tiempo, conteos)
+
+    if conteos_tiempo is None:
+        conteos_tiempo = pd.Series(dtype='int64', index=pd.MultiIndex.from_arrays([[], []]))
+
+    mediana_por_ciudad = {
+        ciudad_destino: _mediana_desde_conteos(grupo.droplevel(0))
+        for ciudad_destino, grupo in conteos_tiempo.groupby(level=0)
+    }
+    mediana_global = _mediana_desde_conteos(conteos_tiempo.groupby(level=1).sum())
+
+    ciudades_limpias = {MAPEO_CIUDADES.get(c, c) for c in ciudades_crudas}
+
+    return {
+        'mediana_por_ciudad': mediana_por_ciudad,
+        'mediana_global': mediana_global,
+        'ciudades_antes': len(ciudades_crudas),
+        'ciudades_despues': len(ciudades_limpias)
+    }
+
+
+def limpiar_transacciones_streaming(ruta_csv, df_inventario, registro, ruta_salida,
+                                    tamano_chunk=TAMANO_CHUNK):
+    """
+    Limpia el CSV de transacciones por chunks y escribe un Parquet particionado.
+
+    Pasada 1 calcula las estadísticas globales (medianas por ciudad).
+    Pasada 2 aplica por chunk las reglas locales a cada fila: fecha, ciudad,
+    signo de cantidad, imputación del placeholder 999 y flag Sin_Catalogo.
+    Cada chunk se escribe como ruta_salida/parte-NNNNN.parquet; el directorio
+    completo se lee luego con pd.read_parquet(ruta_salida).
+
+    Retorna la ruta de salida y el registro con las mismas entradas que
+    limpiar_transacciones.
+    """
+    estadisticas = calcular_estadisticas_transacciones(ruta_csv, tamano_chunk)
+    mediana_por_ciudad = estadisticas['mediana_por_ciudad']
+    mediana_global = estadisticas['mediana_global']
+
+    skus_inventario = construir_indice_claves(df_inventario['SKU_ID'])
+
+    ruta_salida = Path(ruta_salida)
+    ruta_salida.mkdir(parents=True, exist_ok=True)
+    for parte_anterior in ruta_salida.glob('parte-*.parquet'):
+        parte_anterior.unlink()
+
+    fechas_invalidas = 0
+    cantidad_neg = 0
+    cantidad_extremos = 0
+    extremos_por_ciudad = None
+    ventas_huerfanas = 0
+    ingresos_huerfanos = 0.0
+    skus_huerfanos = set()
+
+    for numero, chunk in enumerate(_leer_chunks(ruta_csv, tamano_chunk)):
+        # 1. Fecha_Venta
+        chunk['Fecha_Venta'] = pd.to_datetime(chunk['Fecha_Venta'], format='%d/%m/%Y', errors='coerce')
+        fechas_invalidas += chunk['Fecha_Venta'].isnull().sum()
+
+        # 2. Ciudades
+        chunk['Ciudad_Destino'] = reemplazar_valores(chunk['Ciudad_Destino'], MAPEO_CIUDADES)
+
+        # 3. Cantidades negativas
+        negativas = chunk['Cantidad_Vendida'] < 0
+        cantidad_neg += negativas.sum()
+        chunk['Cantidad_Vendida'] = chunk['Cantidad_Vendida'].abs()
+
+        # 4. Placeholder 999 con medianas globales de la pasada 1
+        extremos = chunk['Tiempo_Entrega_Real'] >= 999
+        if extremos.any():
+            cantidad_extremos += extremos.sum()
+            extremos_por_ciudad = _sumar_conteos(
+                extremos_por_ciudad,
+                chunk.loc[extremos, 'Ciudad_Destino'].astype(object).fillna('Sin grupo').value_counts()
+            )
+            imputado = (
+                chunk.loc[extremos, 'Ciudad_Destino'].astype(object)
+                .map(mediana_por_ciudad)
+                .fillna(mediana_global)
+            )
+            chunk.loc[extremos, 'Tiempo_Entrega_Real'] = imputado.astype('float32')
+
+        # 5. SKUs huérfanos
+        chunk['Sin_Catalogo'] = ~pertenece(skus_inventario, chunk['SKU_ID'])
+        if chunk['Sin_Catalogo'].any():
+            ventas_huerfanas += chunk['Sin_Catalogo'].sum()
+            ingresos_huerfanos += chunk.loc[chunk['Sin_Catalogo'], 'Precio_Venta_Final'].sum()
+            skus_huerfanos.update(chunk.loc[chunk['Sin_Catalogo'], 'SKU_ID'].unique())
+
+        chunk = aplicar_esquema(chunk, ESQUEMAS_LIMPIOS['transacciones'])
+        chunk.to_parquet(ruta_salida / f'parte-{numero:05d}.parquet', index=False)
+
+    # =========================================================================
+    # REGISTRO (mismas plantillas que limpiar_transacciones, ver reglas.py)
+    # =========================================================================
+    reglas = {regla['columna']: regla for regla in REGLAS_TRANSACCIONES}
+
+    registrar_regla(registro, reglas['Fecha_Venta'], {'cantidad': fechas_invalidas})
+    registrar_regla(registro, reglas['Ciudad_Destino'], {
+        'unicos_antes': estadisticas['ciudades_antes'],
+        'unicos_despues': estadisticas['ciudades_despues']
+    })
+    registrar_regla(registro, reglas['Cantidad_Vendida'], {'cantidad': cantidad_neg})
+
+    medianas_por_grupo = {}
+    if extremos_por_ciudad is not None:
+        for ciudad, cantidad in extremos_por_ciudad.items():
+            mediana = mediana_por_ciudad.get(ciudad, mediana_global)
+            medianas_por_grupo[str(ciudad)] = {'cantidad': int(cantidad), 'mediana': round(float(mediana), 2)}
+    registrar_regla(registro, reglas['Tiempo_Entrega_Real'], {
+        'cantidad': cantidad_extremos,
+        'mediana_global': mediana_global,
+        'medianas_por_grupo': medianas_por_grupo
+    })
+
+    registrar_regla(registro, reglas['SKU_ID'], {
+        'cantidad': ventas_huerfanas,
+        'claves': len(skus_huerfanos),
+        'monto': ingresos_huerfanos
+    })
+
+    return ruta_salida, registro
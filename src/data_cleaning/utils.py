@@ -2,15 +2,41 @@
 Utilidades para carga de datos
 """
 
-import pandas as pd
 import streamlit as st
 
+from .cache import leer_csv_cacheado
+from .schema import ESQUEMAS_CRUDOS
 
-@st.cache_data
-def cargar_datos():
-    """Carga los tres datasets originales."""
-    df_inventario = pd.read_csv('inventario_central_v2.csv')
-    df_transacciones = pd.read_csv('transacciones_logistica_v2.csv')
-    df_feedback = pd.read_csv('feedback_clientes_v2.csv')
+
+RUTAS_DATOS = {
+    'inventario': 'inventario_central_v2.csv',
+    'transacciones': 'transacciones_logistica_v2.csv',
+    'feedback': 'feedback_clientes_v2.csv'
+}
+
+
+def leer_datasets(rutas=None):
+    """
+    Lee los datasets fuente con sus esquemas crudos (vía caché Parquet).
     
-    return df_inventario, df_transacciones, df_feedback
+    Returns:
+        dict: {nombre: DataFrame}
+    """
+    rutas = rutas or RUTAS_DATOS
+    return {
+        nombre: leer_csv_cacheado(ruta, dtype=ESQUEMAS_CRUDOS[nombre])
+        for nombre, ruta in rutas.items()
+    }
+
+
+@st.cache_resource
+def cargar_datos():
+    """
+    Carga los tres datasets originales.
+    Usa la caché Parquet en disco para no re-parsear CSVs sin cambios
+    y los dtypes declarados en el registro de esquemas.
+    Se cachea como recurso: todas las sesiones comparten los mismos
+    DataFrames (de solo lectura) en lugar de recibir una copia deserializada.
+    """
+    datasets = leer_datasets()
+    return datasets['inventario'], datasets['transacciones'], datasets['feedback']
@@ -4,5 +4,13 @@ Contiene funciones para mostrar las diferentes pestañas de la aplicación.
 """
 
 from .auditoria import mostrar_tab_auditoria
+from .secciones import pestanas_perezosas, expander_perezoso, seccion_abierta
+from .filtros import mostrar_filtros_globales
+from .explorador import mostrar_explorador
+from .descargas import boton_descarga, boton_descarga_dataframe, boton_descarga_paquete, ETIQUETAS_FORMATO
 
-__all__ = ['mostrar_tab_auditoria']
+__all__ = [
+    'mostrar_tab_auditoria', 'pestanas_perezosas', 'expander_perezoso', 'seccion_abierta',
+    'mostrar_filtros_globales', 'mostrar_explorador',
+    'boton_descarga', 'boton_descarga_dataframe', 'boton_descarga_paquete', 'ETIQUETAS_FORMATO'
+]
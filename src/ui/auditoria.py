@@ -5,6 +5,19 @@ Tab de Auditoría - Muestra métricas de calidad de datos
 import pandas as pd
 import streamlit as st
 
+from ..analytics.validation import incorporar_perfiles_exactos, generar_reporte_limpieza, generar_justificaciones
+from ..analytics.exportacion import exportar_dataframe, huella_reportes
+from .descargas import boton_descarga
+
+
+def _intervalo(resultados, momento, ds):
+    """Texto del intervalo de confianza si el Health Score es aproximado."""
+    intervalo = resultados.get(f'intervalos_{momento}', {}).get(ds)
+    if intervalo is None:
+        return ""
+    bajo, alto = intervalo['health_score']
+    return f" (≈ IC 95%: {bajo:.1f}–{alto:.1f})"
+
 
 def mostrar_tab_auditoria(resultados):
     """
@@ -18,31 +31,42 @@ def mostrar_tab_auditoria(resultados):
     # =========================================================================
     st.subheader("📊 Health Score - Comparación Antes vs Después")
     
+    pendientes = incorporar_perfiles_exactos(resultados)
+    if pendientes:
+        col_info, col_boton = st.columns([4, 1])
+        with col_info:
+            st.info(f"⏳ Scores estimados por muestreo; recalculando {pendientes} perfil(es) exacto(s) en segundo plano.")
+        with col_boton:
+            st.button("🔄 Actualizar", key="actualizar_health_exacto")
+    
     col1, col2, col3 = st.columns(3)
     
     with col1:
         st.metric(
             label="🏭 Inventario",
             value=f"{resultados['health_despues']['inventario']:.1f}",
-            delta=f"+{resultados['mejora']['inventario']:.1f} pts"
+            delta=f"+{resultados['mejora']['inventario']:.1f} pts",
+            help=_intervalo(resultados, 'despues', 'inventario').strip() or None
         )
-        st.caption(f"Antes: {resultados['health_antes']['inventario']:.1f}")
+        st.caption(f"Antes: {resultados['health_antes']['inventario']:.1f}{_intervalo(resultados, 'antes', 'inventario')}")
     
     with col2:
         st.metric(
             label="📦 Transacciones",
             value=f"{resultados['health_despues']['transacciones']:.1f}",
-            delta=f"+{resultados['mejora']['transacciones']:.1f} pts"
+            delta=f"+{resultados['mejora']['transacciones']:.1f} pts",
+            help=_intervalo(resultados, 'despues', 'transacciones').strip() or None
         )
-        st.caption(f"Antes: {resultados['health_antes']['transacciones']:.1f}")
+        st.caption(f"Antes: {resultados['health_antes']['transacciones']:.1f}{_intervalo(resultados, 'antes', 'transacciones')}")
     
     with col3:
         st.metric(
             label="💬 Feedback",
             value=f"{resultados['health_despues']['feedback']:.1f}",
-            delta=f"+{resultados['mejora']['feedback']:.1f} pts"
+            delta=f"+{resultados['mejora']['feedback']:.1f} pts",
+            help=_intervalo(resultados, 'despues', 'feedback').strip() or None
         )
-        st.caption(f"Antes: {resultados['health_antes']['feedback']:.1f}")
+        st.caption(f"Antes: {resultados['health_antes']['feedback']:.1f}{_intervalo(resultados, 'antes', 'feedback')}")
     
     st.markdown("---")
     
@@ -102,6 +126,11 @@ def mostrar_tab_auditoria(resultados):
             **Valor imputado:** {imputacion['valor_imputado']}  
             **Justificación:** {imputacion['justificacion']}
             """)
+            if imputacion.get('medianas_por_grupo'):
+                st.dataframe(
+                    pd.DataFrame.from_dict(imputacion['medianas_por_grupo'], orient='index'),
+                    use_container_width=True
+                )
     
     # Imputaciones de Transacciones
     with st.expander("🚚 Imputaciones - Dataset Transacciones"):
@@ -113,6 +142,11 @@ def mostrar_tab_auditoria(resultados):
             **Valor imputado:** {imputacion['valor_imputado']}  
             **Justificación:** {imputacion['justificacion']}
             """)
+            if imputacion.get('medianas_por_grupo'):
+                st.dataframe(
+                    pd.DataFrame.from_dict(imputacion['medianas_por_grupo'], orient='index'),
+                    use_container_width=True
+                )
     
     # Imputaciones de Feedback
     with st.expander("💬 Imputaciones - Dataset Feedback"):
@@ -124,6 +158,11 @@ def mostrar_tab_auditoria(resultados):
             **Valor imputado:** {imputacion['valor_imputado']}  
             **Justificación:** {imputacion['justificacion']}
             """)
+            if imputacion.get('medianas_por_grupo'):
+                st.dataframe(
+                    pd.DataFrame.from_dict(imputacion['medianas_por_grupo'], orient='index'),
+                    use_container_width=True
+                )
     
     st.markdown("---")
     
@@ -186,40 +225,24 @@ def mostrar_tab_auditoria(resultados):
     # =========================================================================
     # SECCIÓN 6: DESCARGA DEL REPORTE
     # =========================================================================
-    from ..analytics import generar_reporte_limpieza
-    
     st.subheader("📥 Descargar Reportes")
     
     col_download1, col_download2 = st.columns(2)
     
     with col_download1:
-        df_reporte = generar_reporte_limpieza(resultados)
-        st.download_button(
-            label="📊 Descargar Reporte de Limpieza (CSV)",
-            data=df_reporte.to_csv(index=False).encode('utf-8'),
-            file_name='reporte_limpieza_techlogistics.csv',
-            mime='text/csv',
-            use_container_width=True
+        boton_descarga(
+            "📊 Descargar Reporte de Limpieza (CSV)",
+            lambda: exportar_dataframe(generar_reporte_limpieza(resultados), f"{huella_reportes(resultados)}:reporte", 'csv'),
+            'reporte_limpieza_techlogistics.csv',
+            'text/csv',
+            key="download_reporte_limpieza"
         )
     
     with col_download2:
-        # Generar reporte detallado de justificaciones
-        justificaciones = []
-        for ds in ['inventario', 'transacciones', 'feedback']:
-            for imp in resultados['registros'][ds]['valores_imputados']:
-                justificaciones.append({
-                    'Dataset': ds,
-                    'Campo': imp['campo'],
-                    'Cantidad': imp['cantidad'],
-                    'Metodo': imp['metodo'],
-                    'Justificacion': imp['justificacion']
-                })
-        
-        df_justificaciones = pd.DataFrame(justificaciones)
-        st.download_button(
-            label="📝 Descargar Justificaciones (CSV)",
-            data=df_justificaciones.to_csv(index=False).encode('utf-8'),
-            file_name='justificaciones_limpieza.csv',
-            mime='text/csv',
-            use_container_width=True
+        boton_descarga(
+            "📝 Descargar Justificaciones (CSV)",
+            lambda: exportar_dataframe(generar_justificaciones(resultados), f"{huella_reportes(resultados)}:justificaciones", 'csv'),
+            'justificaciones_limpieza.csv',
+            'text/csv',
+            key="download_justificaciones"
         )
@@ -0,0 +1,73 @@
+"""
+Botones de descarga diferidos
+El archivo se genera al hacer clic (data acepta una función), no en cada
+rerun de la página. Los bytes se guardan por huella en analytics.exportacion.
+"""
+
+import streamlit as st
+from packaging.version import Version
+
+from ..analytics.exportacion import FORMATOS_EXPORTACION, exportar_dataframe, exportar_paquete
+
+
+# Versión de Streamlit desde la que st.download_button acepta data=función
+# (generación al hacer clic)
+VERSION_DESCARGA_DIFERIDA = Version('1.50.0')
+
+DESCARGA_DIFERIDA = Version(st.__version__) >= VERSION_DESCARGA_DIFERIDA
+
+ETIQUETAS_FORMATO = {
+    'csv': "CSV",
+    'csv.gz': "CSV comprimido (gzip)",
+    'parquet': "Parquet"
+}
+
+
+def boton_descarga(etiqueta, generar, nombre_archivo, mime, key):
+    """
+    st.download_button que genera los bytes solo cuando se piden.
+
+    En versiones de Streamlit sin data=función se muestra primero un botón
+    "Preparar" y el archivo se genera al pulsarlo.
+
+    Args:
+        generar (callable): Función sin argumentos que retorna los bytes
+    """
+    if DESCARGA_DIFERIDA:
+        return st.download_button(
+            label=etiqueta, data=generar, file_name=nombre_archivo, mime=mime,
+            key=key, on_click='ignore', use_container_width=True
+        )
+
+    clave_lista = f"{key}_listo"
+    if not st.session_state.get(clave_lista):
+        if not st.button(f"⚙️ Preparar: {etiqueta}", key=f"{key}_preparar", use_container_width=True):
+            return False
+        st.session_state[clave_lista] = True
+    return st.download_button(
+        label=etiqueta, data=generar(), file_name=nombre_archivo, mime=mime,
+        key=key, use_container_width=True
+    )
+
+
+def boton_descarga_dataframe(etiqueta, df, huella, nombre_base, key, formato='csv'):
+    """Botón de descarga de un DataFrame en el formato de FORMATOS_EXPORTACION indicado."""
+    spec = FORMATOS_EXPORTACION[formato]
+    return boton_descarga(
+        etiqueta,
+        lambda: exportar_dataframe(df, huella, formato),
+        f"{nombre_base}.{spec['extension']}",
+        spec['mime'],
+        key
+    )
+
+
+def boton_descarga_paquete(resultados, key):
+    """Botón de descarga del ZIP con los datasets limpios, el reporte y las justificaciones."""
+    return boton_descarga(
+        "🗜️ Descargar todo (ZIP: 3 datasets + reportes)",
+        lambda: exportar_paquete(resultados),
+        'techlogistics_datos_limpios.zip',
+        'application/zip',
+        key
+    )
@@ -0,0 +1,117 @@
+"""
+Explorador paginado de datasets limpios (Auditoría > Datos Limpios)
+Solo la página visible se envía al navegador; orden, filtros y búsqueda se
+resuelven en el servidor (analytics.explorador).
+"""
+
+import pandas as pd
+import streamlit as st
+
+from ..analytics.explorador import TAMANO_PAGINA, consultar_pagina
+
+
+TAMANOS_PAGINA = [25, TAMANO_PAGINA, 100, 250, 500]
+
+SIN_ORDEN = "(orden original)"
+
+
+def _control_filtro(df, columna, clave):
+    """Widget de filtro según el tipo de la columna; retorna la condición o None."""
+    serie = df[columna]
+
+    if isinstance(serie.dtype, pd.CategoricalDtype) or pd.api.types.is_bool_dtype(serie.dtype):
+        opciones = list(serie.cat.categories) if isinstance(serie.dtype, pd.CategoricalDtype) else [True, False]
+        valores = st.multiselect(columna, opciones, key=f"{clave}_valores_{columna}")
+        return {'valores': valores} if valores else None
+
+    if pd.api.types.is_datetime64_any_dtype(serie.dtype):
+        minimo, maximo = serie.min(), serie.max()
+        if pd.isna(minimo):
+            return None
+        rango = st.date_input(
+            columna,
+            value=(minimo.date(), maximo.date()),
+            min_value=minimo.date(),
+            max_value=maximo.date(),
+            key=f"{clave}_fechas_{columna}"
+        )
+        if len(rango) != 2:
+            return None
+        return {'rango': (pd.Timestamp(rango[0]), pd.Timestamp(rango[1]) + pd.Timedelta(days=1) - pd.Timedelta(1))}
+
+    if pd.api.types.is_numeric_dtype(serie.dtype):
+        minimo, maximo = serie.min(), serie.max()
+        if pd.isna(minimo):
+            return None
+        col_min, col_max = st.columns(2)
+        with col_min:
+            desde = st.number_input(f"{columna} ≥", value=float(minimo), key=f"{clave}_min_{columna}")
+        with col_max:
+            hasta = st.number_input(f"{columna} ≤", value=float(maximo), key=f"{clave}_max_{columna}")
+        if desde <= float(minimo) and hasta >= float(maximo):
+            return None
+        return {'rango': (desde, hasta)}
+
+    texto = st.text_input(f"{columna} contiene", key=f"{clave}_texto_{columna}")
+    return {'contiene': texto} if texto.strip() else None
+
+
+@st.fragment
+def mostrar_explorador(df, huella, clave):
+    """
+    Explorador paginado de un dataset. Es un fragmento: cambiar de página,
+    orden o filtro solo re-ejecuta el explorador.
+
+    Args:
+        df (pd.DataFrame): Dataset completo
+        huella (str): Huella del dataset (reutiliza órdenes y filtros calculados)
+        clave (str): Prefijo de las keys de los widgets (una por dataset)
+    """
+    col_busqueda, col_orden, col_sentido, col_tamano = st.columns([3, 2, 1, 1])
+    with col_busqueda:
+        busqueda = st.text_input("🔎 Buscar texto", key=f"{clave}_busqueda")
+    with col_orden:
+        orden = st.selectbox("Ordenar por", [SIN_ORDEN] + list(df.columns), key=f"{clave}_orden")
+    with col_sentido:
+        descendente = st.toggle("Descendente", key=f"{clave}_descendente")
+    with col_tamano:
+        tamano = st.selectbox("Filas/página", TAMANOS_PAGINA, index=TAMANOS_PAGINA.index(TAMANO_PAGINA), key=f"{clave}_tamano")
+
+    columnas_filtro = st.multiselect("Filtrar columnas", list(df.columns), key=f"{clave}_columnas_filtro")
+    filtros = {}
+    for columna in columnas_filtro:
+        condicion = _control_filtro(df, columna, clave)
+        if condicion:
+            filtros[columna] = condicion
+
+    pagina = st.session_state.get(f"{clave}_pagina", 1)
+    resultado = consultar_pagina(
+        df,
+        huella,
+        pagina=pagina - 1,
+        tamano=tamano,
+        orden=None if orden == SIN_ORDEN else orden,
+        ascendente=not descendente,
+        filtros=filtros,
+        busqueda=busqueda
+    )
+
+    st.dataframe(resultado['filas'], use_container_width=True)
+
+    col_pagina, col_info = st.columns([1, 3])
+    with col_pagina:
+        st.number_input(
+            "Página",
+            min_value=1,
+            max_value=resultado['paginas'],
+            value=resultado['pagina'] + 1,
+            step=1,
+            key=f"{clave}_pagina"
+        )
+    with col_info:
+        desde = resultado['desde'] + 1 if resultado['total'] else 0
+        hasta = resultado['desde'] + len(resultado['filas'])
+        st.caption(
+            f"Filas {desde:,}–{hasta:,} de {resultado['total']:,}"
+            f" ({len(df):,} en el dataset) · página {resultado['pagina'] + 1:,} de {resultado['paginas']:,}"
+        )
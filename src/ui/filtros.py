@@ -0,0 +1,62 @@
+"""
+Filtros globales del sidebar (fechas, ciudad, canal, categoría y bodega)
+"""
+
+import pandas as pd
+import streamlit as st
+
+
+ETIQUETAS_FILTRO = {
+    'Ciudad_Destino': '🏙️ Ciudad',
+    'Canal_Venta': '🛒 Canal',
+    'Categoria': '📦 Categoría',
+    'Bodega_Origen': '🏢 Bodega'
+}
+
+
+def mostrar_filtros_globales(indice):
+    """
+    Muestra los filtros globales a partir del índice de filtros
+    (analytics.indice_filtros) y retorna la selección.
+
+    Returns:
+        dict: {'fecha_inicio', 'fecha_fin', <dimensión>: [valores]}
+        (lista vacía = todas)
+    """
+    st.subheader("🎛️ Filtros Globales")
+    filtro = {}
+
+    fechas = indice['fechas']
+    validas = fechas[~pd.isna(fechas)]
+    if len(validas):
+        fecha_min = pd.Timestamp(validas[0]).date()
+        fecha_max = pd.Timestamp(validas[-1]).date()
+        st.markdown("**📅 Rango de Fechas**")
+        filtro['fecha_inicio'] = st.date_input(
+            "Desde:",
+            value=fecha_min,
+            min_value=fecha_min,
+            max_value=fecha_max,
+            key="fecha_inicio"
+        )
+        filtro['fecha_fin'] = st.date_input(
+            "Hasta:",
+            value=fecha_max,
+            min_value=fecha_min,
+            max_value=fecha_max,
+            key="fecha_fin"
+        )
+    else:
+        st.warning("No se pudieron cargar fechas.")
+
+    for dimension, etiqueta in ETIQUETAS_FILTRO.items():
+        if dimension in indice['valores']:
+            filtro[dimension] = st.multiselect(
+                etiqueta,
+                indice['valores'][dimension],
+                placeholder="Todas",
+                key=f"filtro_{dimension}"
+            )
+
+    st.caption("Aplican a Operaciones, Cliente e Insights IA; la auditoría de calidad usa los datasets completos.")
+    return filtro
@@ -0,0 +1,34 @@
+"""
+Pestañas y expanders perezosos
+Con estado (on_change='rerun') Streamlit indica qué pestaña/expander está
+abierto, y el contenido de los cerrados no se ejecuta en cada rerun.
+"""
+
+import streamlit as st
+
+
+def pestanas_perezosas(etiquetas, key):
+    """
+    st.tabs con estado. En versiones de Streamlit sin on_change en st.tabs
+    retorna pestañas normales (todas se ejecutan).
+    """
+    try:
+        return st.tabs(etiquetas, key=key, on_change='rerun')
+    except TypeError:
+        return st.tabs(etiquetas)
+
+
+def expander_perezoso(etiqueta, key, expanded=False):
+    """st.expander con estado (ver pestanas_perezosas)."""
+    try:
+        return st.expander(etiqueta, expanded=expanded, key=key, on_change='rerun')
+    except TypeError:
+        return st.expander(etiqueta, expanded=expanded)
+
+
+def seccion_abierta(contenedor):
+    """
+    True si la pestaña o expander está abierto, o si Streamlit no lleva su
+    estado (en ese caso se ejecuta siempre, como antes).
+    """
+    return getattr(contenedor, 'open', None) is not False
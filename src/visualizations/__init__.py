@@ -4,5 +4,11 @@ Contiene funciones para generar dashboards y gráficos.
 """
 
 from .dashboards import generar_dashboard_estrategico
+from .dispersion import figura_dispersion_margen
+from .histogramas import figura_histograma
+from .cache_figuras import figura_cacheada, estadisticas_cache_figuras, limpiar_cache_figuras
 
-__all__ = ['generar_dashboard_estrategico']
+__all__ = [
+    'generar_dashboard_estrategico', 'figura_dispersion_margen', 'figura_histograma',
+    'figura_cacheada', 'estadisticas_cache_figuras', 'limpiar_cache_figuras'
+]
@@ -0,0 +1,117 @@
+"""
+Caché de figuras Plotly por huella de los datos y parámetros de la vista
+Guarda la figura ya construida (go.Figure) para no reconstruirla ni
+re-validarla en cada rerun de Streamlit; se comparte entre sesiones (solo
+lectura) y descarta las menos usadas cuando se supera el tamaño máximo.
+"""
+
+import hashlib
+import json
+import sys
+import threading
+from collections import OrderedDict
+
+import numpy as np
+from plotly.basedatatypes import BaseFigure
+
+
+# Tamaño máximo (MB) de las figuras guardadas
+MAX_MB_FIGURAS = 64
+
+_FIGURAS = OrderedDict()
+_ESTADISTICAS = {'hits': 0, 'misses': 0, 'bytes': 0}
+_CANDADO = threading.Lock()
+
+
+def clave_figura(huella, vista):
+    """Clave de la figura: huella de los datos + parámetros de la vista (dict)."""
+    serializado = json.dumps({'huella': huella, 'vista': vista}, sort_keys=True, default=str)
+    return hashlib.sha256(serializado.encode('utf-8')).hexdigest()
+
+
+def _bytes_objeto(valor):
+    """Bytes aproximados de un objeto (dicts, listas, arreglos numpy, escalares)."""
+    if isinstance(valor, np.ndarray):
+        if valor.dtype == object:
+            return valor.nbytes + sum(_bytes_objeto(elemento) for elemento in valor.ravel())
+        return valor.nbytes
+    if isinstance(valor, dict):
+        return sys.getsizeof(valor) + sum(_bytes_objeto(k) + _bytes_objeto(v) for k, v in valor.items())
+    if isinstance(valor, (list, tuple)):
+        return sys.getsizeof(valor) + sum(_bytes_objeto(elemento) for elemento in valor)
+    return sys.getsizeof(valor)
+
+
+def _bytes_figura(figura, info):
+    """Bytes de la figura guardada (datos y layout, sin copiarlos) más su info."""
+    return _bytes_objeto(figura.to_plotly_json()) + _bytes_objeto(info)
+
+
+def figura_cacheada(huella, vista, construir, max_mb=MAX_MB_FIGURAS):
+    """
+    Retorna la figura para (huella, vista), construyéndola solo si no está en caché.
+
+    La figura retornada es el objeto guardado, compartido entre sesiones: es
+    de solo lectura (pasarla a st.plotly_chart; no modificarla).
+
+    Args:
+        huella (str): Huella de contenido de los datos de la figura
+        vista (dict): Parámetros que cambian la figura (gráfico, filtros, etc.)
+        construir (callable): Sin argumentos; retorna la figura o
+            (figura, info)
+
+    Returns:
+        Lo mismo que construir: figura o (figura, info)
+    """
+    clave = clave_figura(huella, vista)
+
+    with _CANDADO:
+        entrada = _FIGURAS.get(clave)
+        if entrada is not None:
+            _ESTADISTICAS['hits'] += 1
+            _FIGURAS.move_to_end(clave)
+        else:
+            _ESTADISTICAS['misses'] += 1
+
+    if entrada is None:
+        resultado = construir()
+        tupla = not isinstance(resultado, BaseFigure)
+        figura, info = resultado if tupla else (resultado, None)
+        entrada = {'figura': figura, 'info': info, 'tupla': tupla}
+        _guardar(clave, entrada, max_mb)
+
+    if entrada['tupla']:
+        return entrada['figura'], entrada['info']
+    return entrada['figura']
+
+
+def _guardar(clave, entrada, max_mb):
+    tamano = _bytes_figura(entrada['figura'], entrada['info'])
+    with _CANDADO:
+        anterior = _FIGURAS.pop(clave, None)
+        if anterior is not None:
+            _ESTADISTICAS['bytes'] -= anterior['bytes']
+        entrada['bytes'] = tamano
+        _FIGURAS[clave] = entrada
+        _ESTADISTICAS['bytes'] += tamano
+        while _ESTADISTICAS['bytes'] > max_mb * 1e6 and len(_FIGURAS) > 1:
+            _, desalojada = _FIGURAS.popitem(last=False)
+            _ESTADISTICAS['bytes'] -= desalojada['bytes']
+
+
+def estadisticas_cache_figuras():
+    """Hits, misses, figuras guardadas y MB (estimados) de la caché de figuras."""
+    with _CANDADO:
+        return {
+            'hits': _ESTADISTICAS['hits'],
+            'misses': _ESTADISTICAS['misses'],
+            'figuras': len(_FIGURAS),
+            'mb': round(_ESTADISTICAS['bytes'] / 1e6, 2)
+        }
+
+
+def limpiar_cache_figuras():
+    """Vacía la caché de figuras y reinicia las estadísticas."""
+    with _CANDADO:
+        _FIGURAS.clear()
+        _ESTADISTICAS.update(hits=0, misses=0, bytes=0)
@@ -0,0 +1,128 @@
+"""
+Gráfico de dispersión de márgenes con reducción en el servidor
+Según el volumen: SVG normal, WebGL, o WebGL con las mayores pérdidas como
+puntos individuales (hasta MAX_PERDIDAS_INDIVIDUALES) y el resto de las
+ventas agregadas en bins de densidad.
+"""
+
+import numpy as np
+import pandas as pd
+import plotly.express as px
+import plotly.graph_objects as go
+
+
+# Filas a partir de las cuales se usa WebGL (scattergl)
+UMBRAL_WEBGL = 5_000
+
+# Filas a partir de las cuales los márgenes positivos se agregan en bins
+UMBRAL_AGREGADO = 50_000
+
+# Bins por eje de la grilla de densidad
+BINS_DENSIDAD = 120
+
+# Pérdidas (margen negativo) que se muestran como puntos en modo agregado:
+# las de mayor pérdida; el resto entra en la grilla de densidad
+MAX_PERDIDAS_INDIVIDUALES = 5_000
+
+HOVER_MARGEN = ['SKU_ID', 'Precio_Venta_Final', 'Costo_Unitario_USD']
+
+
+def _agregar_en_bins(df, x, y, color, bins):
+    """
+    Agrupa los puntos en una grilla bins x bins por categoría.
+    Retorna una fila por bin no vacío con el centroide y la cantidad de puntos.
+    """
+    def indice_bin(valores):
+        minimo, maximo = valores.min(), valores.max()
+        ancho = (maximo - minimo) / bins or 1.0
+        return np.minimum(((valores - minimo) / ancho).astype('int64'), bins - 1)
+
+    return (
+        pd.DataFrame({
+            color: df[color],
+            'bin_x': indice_bin(df[x].to_numpy(dtype='float64')),
+            'bin_y': indice_bin(df[y].to_numpy(dtype='float64')),
+            x: df[x].to_numpy(dtype='float64'),
+            y: df[y].to_numpy(dtype='float64')
+        })
+        .groupby([color, 'bin_x', 'bin_y'], observed=True)
+        .agg(**{x: (x, 'mean'), y: (y, 'mean'), 'Puntos': (x, 'size')})
+        .reset_index()
+    )
+
+
+def figura_dispersion_margen(df_margen, titulo, umbral_webgl=UMBRAL_WEBGL,
+                             umbral_agregado=UMBRAL_AGREGADO, bins=BINS_DENSIDAD,
+                             max_perdidas=MAX_PERDIDAS_INDIVIDUALES):
+    """
+    Construye el scatter Cantidad_Vendida vs Margen_Total por Categoría.
+
+    Returns:
+        tuple: (figura, dict con 'modo' ('svg' | 'webgl' | 'agregado'),
+        'filas', 'puntos_reducidos' y 'perdidas_individuales')
+    """
+    datos = df_margen.dropna(subset=['Margen_Total'])
+    filas = len(datos)
+    colores = px.colors.qualitative.Bold
+
+    if filas <= umbral_agregado:
+        modo = 'svg' if filas <= umbral_webgl else 'webgl'
+        figura = px.scatter(
+            datos,
+            x='Cantidad_Vendida',
+            y='Margen_Total',
+            color='Categoria',
+            title=titulo,
+            hover_data=HOVER_MARGEN,
+            color_discrete_sequence=colores,
+            render_mode=modo
+        )
+        return figura, {'modo': modo, 'filas': filas, 'puntos_reducidos': 0, 'perdidas_individuales': 0}
+
+    # Mayores pérdidas: individuales (son los casos a auditar)
+    margen = datos['Margen_Total'].to_numpy(dtype='float64')
+    posiciones_perdida = np.flatnonzero(margen < 0)
+    mayores = posiciones_perdida[np.argsort(margen[posiciones_perdida], kind='stable')[:max_perdidas]]
+    seleccion = np.zeros(filas, dtype=bool)
+    seleccion[mayores] = True
+    individuales = datos[seleccion]
+    figura = px.scatter(
+        individuales,
+        x='Cantidad_Vendida',
+        y='Margen_Total',
+        color='Categoria',
+        title=titulo,
+        hover_data=HOVER_MARGEN,
+        color_discrete_sequence=colores,
+        render_mode='webgl'
+    )
+    color_por_categoria = {traza.name: traza.marker.color for traza in figura.data}
+
+    # Resto de las ventas: centroides de densidad, tamaño según puntos del bin
+    densidad = _agregar_en_bins(
+        datos[~seleccion], 'Cantidad_Vendida', 'Margen_Total', 'Categoria', bins
+    )
+    for i, (categoria, grupo) in enumerate(densidad.groupby('Categoria', observed=True)):
+        figura.add_trace(go.Scattergl(
+            x=grupo['Cantidad_Vendida'],
+            y=grupo['Margen_Total'],
+            mode='markers',
+            name=f'{categoria} (densidad)',
+            legendgroup=str(categoria),
+            marker={
+                'color': color_por_categoria.get(str(categoria), colores[i % len(colores)]),
+                'size': 4 + 3 * np.sqrt(grupo['Puntos']),
+                'sizemode': 'diameter',
+                'opacity': 0.5
+            },
+            customdata=grupo[['Puntos']],
+            hovertemplate='Categoria=' + str(categoria) + '<br>Puntos en el bin=%{customdata[0]}<extra></extra>'
+        ))
+
+    puntos_enviados = len(individuales) + len(densidad)
+    return figura, {
+        'modo': 'agregado',
+        'filas': filas,
+        'puntos_reducidos': filas - puntos_enviados,
+        'perdidas_individuales': len(individuales)
+    }
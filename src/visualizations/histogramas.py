@@ -0,0 +1,41 @@
+"""
+Histogramas dibujados a partir de conteos precalculados
+(resultados['analitica']['histogramas']) como trazas de barras.
+"""
+
+import plotly.graph_objects as go
+
+
+def figura_histograma(df_histogramas, variable, titulo, color='#636EFA', etiqueta=None):
+    """
+    Construye el histograma de 'variable' con una barra por bin.
+
+    Args:
+        df_histogramas (pd.DataFrame): Salida de calcular_histogramas
+        variable (str): Variable a dibujar
+        titulo (str): Título de la figura
+        color (str): Color de las barras
+        etiqueta (str): Título del eje X (por defecto, el nombre de la variable)
+
+    Returns:
+        go.Figure
+    """
+    bins = df_histogramas[df_histogramas['variable'] == variable]
+    centros = (bins['bin_inicio'] + bins['bin_fin']) / 2
+    anchos = bins['bin_fin'] - bins['bin_inicio']
+
+    figura = go.Figure(go.Bar(
+        x=centros.to_numpy(),
+        y=bins['conteo'].to_numpy(),
+        width=anchos.to_numpy(),
+        marker_color=color,
+        customdata=bins[['bin_inicio', 'bin_fin']].to_numpy(),
+        hovertemplate='[%{customdata[0]:g}, %{customdata[1]:g}): %{y}<extra></extra>'
+    ))
+    figura.update_layout(
+        title=titulo,
+        xaxis_title=etiqueta or variable,
+        yaxis_title='count',
+        bargap=0
+    )
+    return figura